@@ -0,0 +1,124 @@
+"""
+Paridad: parsers HTML puros (utils.html_parser) vs extractores en vivo
+
+Para cada HTML grabado en benchmarks/fixtures/ (o artefactos *.html[.gz]
+pasados como argumento):
+
+1. parse_* del HTML debe coincidir con el resultado esperado guardado en
+   <fixture>.expected.json (no necesita navegador).
+2. Si hay Chromium de Playwright, carga el HTML con page.set_content y compara
+   parse_* contra los extractores en vivo (page.$$eval + innerText), que es
+   donde lxml y el navegador pueden diferir.
+
+Sale con código 1 si algún caso no coincide.
+
+Uso:
+    python -m benchmarks.html_parser_parity
+    python -m benchmarks.html_parser_parity --no-browser
+    python -m benchmarks.html_parser_parity --update     # regenera los .expected.json
+    python -m benchmarks.html_parser_parity google:/tmp/scraper-artifacts/google/<task>-results.html.gz
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+
+from utils.html_parser import parse_google_offers, parse_jumbo_products
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Fixture -> tipo de página (qué parser y qué extractor en vivo usar)
+FIXTURES = {
+    "jumbo_search.html": "jumbo",
+    "google_panel.html": "google",
+    "google_main.html": "google",
+}
+
+_PARSERS = {
+    "jumbo": parse_jumbo_products,
+    "google": parse_google_offers,
+}
+
+
+def _read(path: Path) -> bytes:
+    with (gzip.open if path.suffix == '.gz' else open)(path, 'rb') as f:
+        return f.read()
+
+
+def _expected_path(path: Path) -> Path:
+    return path.with_name(path.name.removesuffix('.gz').removesuffix('.html') + '.expected.json')
+
+
+def _diff(label: str, expected: list[dict], actual: list[dict]) -> bool:
+    if expected == actual:
+        print(f"[Parity] ✓ {label} ({len(actual)} registros)")
+        return True
+    print(f"[Parity] ✗ {label}: esperado {len(expected)} registros, obtenido {len(actual)}")
+    for i in range(max(len(expected), len(actual))):
+        want = expected[i] if i < len(expected) else None
+        got = actual[i] if i < len(actual) else None
+        if want != got:
+            print(f"    #{i + 1} esperado: {want}")
+            print(f"    #{i + 1} obtenido: {got}")
+    return False
+
+
+async def _live_extract(page, kind: str, content: bytes) -> list[dict]:
+    from scrapers.google_shopping import _extract_main_results, _extract_panel_results
+    from scrapers.jumbo_catalog import _extract_products
+
+    await page.set_content(content.decode('utf-8', errors='replace'))
+    if kind == "jumbo":
+        return await _extract_products(page)
+    return await _extract_panel_results(page) or await _extract_main_results(page)
+
+
+async def main(cases: list[tuple[str, Path]], update: bool = False, browser: bool = True) -> bool:
+    ok = True
+    parsed = {}
+    for kind, path in cases:
+        records = parsed[path] = _PARSERS[kind](_read(path))
+        expected_path = _expected_path(path)
+        if update:
+            expected_path.write_text(json.dumps(records, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            print(f"[Parity] {expected_path.name}: {len(records)} registros guardados")
+        elif expected_path.exists():
+            expected = json.loads(expected_path.read_text(encoding="utf-8"))
+            ok &= _diff(f"{path.name} vs {expected_path.name}", expected, records)
+
+    if not browser or update:
+        return ok
+
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        try:
+            chromium = await p.chromium.launch(headless=True)
+        except Exception as e:
+            print(f"[Parity] Sin Chromium de Playwright, se omite la comparación en vivo: {str(e).splitlines()[0]}")
+            return ok
+        page = await chromium.new_page()
+        for kind, path in cases:
+            live = await _live_extract(page, kind, _read(path))
+            ok &= _diff(f"{path.name}: parse_* vs navegador", live, parsed[path])
+        await chromium.close()
+    return ok
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    cases = []
+    for arg in args:
+        kind, _, path = arg.partition(':')
+        if kind not in _PARSERS or not path:
+            print("Uso: python -m benchmarks.html_parser_parity [--update] [--no-browser] [jumbo|google:<archivo.html[.gz]> ...]")
+            sys.exit(1)
+        cases.append((kind, Path(path)))
+    if not cases:
+        cases = [(kind, FIXTURES_DIR / name) for name, kind in FIXTURES.items()]
+
+    passed = asyncio.run(main(cases, update="--update" in sys.argv, browser="--no-browser" not in sys.argv))
+    sys.exit(0 if passed else 1)
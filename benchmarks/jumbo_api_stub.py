@@ -0,0 +1,109 @@
+"""
+Prueba local del backend api de Jumbo contra un servidor stub (sin red)
+
+Levanta un servidor HTTP local que responde /search/<término> con el JSON de
+Constructor.io grabado en benchmarks/fixtures/jumbo_search_api.json (la
+página 1; las siguientes vienen vacías), apunta JUMBO_SEARCH_API_URL a él y
+corre _fetch_products_api. Compara los productos con
+fixtures/jumbo_search.expected.json (los mismos que parsea el camino
+browser) y mide la latencia por request con el cliente HTTP compartido.
+
+Sale con código 1 si los productos no coinciden.
+
+Uso:
+    python -m benchmarks.jumbo_api_stub [requests]
+    python -m benchmarks.jumbo_api_stub 200 /tmp/respuesta-grabada.json
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+_STUB_KEY = "stub-key"
+
+
+def _make_handler(payload: bytes, empty_payload: bytes, received: dict):
+    class _StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            received["requests"] += 1
+            if not url.path.startswith("/search/"):
+                status, body = 404, b"{}"
+            elif params.get("key") != [_STUB_KEY]:
+                status, body = 401, b'{"message": "invalid key"}'
+            else:
+                status = 200
+                body = payload if params.get("page", ["1"]) == ["1"] else empty_payload
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return _StubHandler
+
+
+async def main(server, requests: int, expected: list[dict] | None) -> bool:
+    from scrapers.jumbo_catalog import _fetch_products_api
+    from utils.http_client import close_http_client
+    from utils.redis_client import close_redis
+
+    os.environ["JUMBO_SEARCH_API_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["JUMBO_CNSTRC_KEY"] = _STUB_KEY
+    try:
+        products = await _fetch_products_api("Soprole")
+        empty = await _fetch_products_api("Soprole", page_number=2)
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            await _fetch_products_api("Soprole")
+        elapsed = time.perf_counter() - start
+    finally:
+        await close_http_client()
+        await close_redis()
+
+    for product in products:
+        print(f"[JumboApiStub] {product['jumbo_id']}  CLP {product['price']}  {product['name']}")
+    print(f"[JumboApiStub] {len(products)} productos (página 2: {len(empty)}); "
+          f"{requests} requests en {elapsed:.2f}s ({elapsed / max(1, requests) * 1000:.1f} ms/request)")
+
+    ok = not empty
+    if expected is not None and products != expected:
+        print("[JumboApiStub] ✗ Los productos no coinciden con jumbo_search.expected.json")
+        ok = False
+    elif expected is not None:
+        print("[JumboApiStub] ✓ Mismos productos que el camino browser (jumbo_search.expected.json)")
+    return ok
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    recorded = Path(sys.argv[2]) if len(sys.argv) > 2 else FIXTURES_DIR / "jumbo_search_api.json"
+    payload = recorded.read_bytes()
+    empty_payload = json.dumps({"response": {"total_num_results": 0, "results": []}}).encode()
+
+    # Solo la respuesta grabada por defecto tiene productos esperados conocidos
+    expected = None
+    if len(sys.argv) <= 2:
+        expected = json.loads((FIXTURES_DIR / "jumbo_search.expected.json").read_text(encoding="utf-8"))
+
+    received = {"requests": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(payload, empty_payload, received))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        passed = asyncio.run(main(server, count, expected))
+    finally:
+        server.shutdown()
+    print(f"[JumboApiStub] Stub recibió {received['requests']} requests")
+    sys.exit(0 if passed else 1)
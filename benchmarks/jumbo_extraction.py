@@ -0,0 +1,78 @@
+"""
+Benchmark: extracción de tarjetas Jumbo "handles" vs "bulk"
+
+Genera una página local con N tarjetas data-cnstrc-* (sin red) y mide tiempo y
+número de llamadas a Playwright (round trips CDP) de cada modo de extracción.
+
+Uso:
+    python -m benchmarks.jumbo_extraction [n_tarjetas] [repeticiones]
+"""
+
+import asyncio
+import sys
+import time
+from playwright.async_api import async_playwright, ElementHandle, Page
+
+from scrapers.jumbo_catalog import _extract_products
+
+
+_COUNTED_METHODS = [
+    (Page, 'query_selector_all'),
+    (Page, 'eval_on_selector_all'),
+    (ElementHandle, 'get_attribute'),
+    (ElementHandle, 'query_selector'),
+]
+
+
+def _fixture_html(n_cards: int) -> str:
+    cards = "\n".join(
+        f'<div data-cnstrc-item-id="{i}" data-cnstrc-item-name="Producto {i}" '
+        f'data-cnstrc-item-price="{1000 + i}">'
+        f'<a href="/producto-{i}/p"><img src="https://img.example/{i}.jpg"></a></div>'
+        for i in range(n_cards)
+    )
+    return f"<html><body>{cards}</body></html>"
+
+
+def _install_counter() -> dict:
+    counter = {"calls": 0}
+    for cls, name in _COUNTED_METHODS:
+        original = getattr(cls, name)
+
+        async def wrapper(self, *args, _original=original, **kwargs):
+            counter["calls"] += 1
+            return await _original(self, *args, **kwargs)
+
+        setattr(cls, name, wrapper)
+    return counter
+
+
+async def main(n_cards: int = 80, repeats: int = 5):
+    counter = _install_counter()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(_fixture_html(n_cards))
+
+        print(f"[Benchmark] {n_cards} tarjetas, {repeats} repeticiones")
+        reference = None
+        for mode in ("handles", "bulk"):
+            counter["calls"] = 0
+            start = time.perf_counter()
+            for _ in range(repeats):
+                products = await _extract_products(page, mode)
+            elapsed = (time.perf_counter() - start) / repeats
+            calls = counter["calls"] // repeats
+
+            if reference is None:
+                reference = products
+            assert products == reference, "Los modos de extracción no coinciden"
+            print(f"  {mode:8s} {elapsed * 1000:8.1f} ms/página  {calls:5d} round trips  "
+                  f"{len(products)} productos")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*args))
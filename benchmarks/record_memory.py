@@ -0,0 +1,82 @@
+"""
+Benchmark: memoria por registro, dicts actuales vs utils.records
+
+Construye N productos Jumbo y N ofertas de Google Shopping con strings nuevos
+por fila (como al parsear HTML) y mide con tracemalloc la memoria retenida por
+cada representación: dict, registro con __slots__ y tupla de to_tuple().
+
+Uso:
+    python -m benchmarks.record_memory [n_registros]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from utils.records import JumboProduct, RetailerOffer
+
+
+_RETAILERS = ["Lider", "Jumbo", "Unimarc", "Santa Isabel", "Tottus", "Cornershop", "Rappi"]
+
+
+def _fresh(text: str) -> str:
+    # Copia nueva del string, como la que deja cada fila parseada
+    return "".join(list(text))
+
+
+def _offer_dict(i: int) -> dict:
+    return {
+        "retailer": _fresh(_RETAILERS[i % len(_RETAILERS)]),
+        "nombre": f"Leche Entera Natural Soprole 1L #{i}",
+        "precio": f"CLP {1000 + i % 900:,}".replace(",", "."),
+        "sku": "N/A",
+        "url": f"https://www.tienda.cl/producto-{i}/p",
+        "encontrado": True,
+    }
+
+
+def _product_dict(i: int) -> dict:
+    return {
+        'name': f"Producto Soprole {i}",
+        'jumbo_id': str(100000 + i),
+        'price': 1000 + i % 900,
+        'url': f"https://www.jumbo.cl/producto-{i}/p",
+        'image_url': f"https://img.jumbo.cl/{i}.jpg",
+    }
+
+
+def _measure(build, n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [build(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return (after - before) / n
+
+
+def main(n: int = 100_000):
+    print(f"[Benchmark] {n} registros, bytes retenidos por registro (incluye strings)")
+    cases = {
+        "Jumbo": [
+            ("dict", _product_dict),
+            ("JumboProduct", lambda i: JumboProduct.from_dict(_product_dict(i))),
+            ("tuple", lambda i: JumboProduct.from_dict(_product_dict(i)).to_tuple()),
+        ],
+        "Google": [
+            ("dict", _offer_dict),
+            ("RetailerOffer", lambda i: RetailerOffer.from_dict(_offer_dict(i))),
+            ("tuple", lambda i: RetailerOffer.from_dict(_offer_dict(i)).to_tuple()),
+        ],
+    }
+    for label, builders in cases.items():
+        baseline = None
+        for name, build in builders:
+            per_record = _measure(build, n)
+            baseline = baseline or per_record
+            print(f"  {label:7s} {name:14s} {per_record:8.0f} B  ({per_record / baseline:.0%} del dict)")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
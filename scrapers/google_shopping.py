@@ -6,355 +6,636 @@ Usa playwright-stealth para evitar detección en producción.
 """
 
 import asyncio
-import re
 import random
-from playwright.async_api import async_playwright
+from collections import deque
+from contextlib import asynccontextmanager
+from urllib.parse import quote_plus
 from playwright_stealth import Stealth
 
-
-# Extrae nombre, precio CLP y tienda desde el aria-label de cada tarjeta de producto.
-# Formato: "<nombre>. Precio actual: CLP <precio>. <tienda> y más."
-# Usamos aria-label porque es requerido por accesibilidad y Google no lo rota.
-_ARIA_PRICE_RE = re.compile(
-    r'^(.+?)\.\s+Precio actual:\s+CLP\s+([\d\.,]+)\.\s+(.+?)(?:\s+y más)?(?:\.\s*.*)?$',
-    re.DOTALL
-)
-
-# Badges que pueden aparecer antes del nombre del retailer en el texto del panel
-_PANEL_BADGES = {'más popular', 'cerca', 'mejor precio', 'más vendido', 'oferta'}
-
-
-def _parse_panel_link_text(text: str) -> tuple[str, str]:
-    """
-    Parsea el texto de un link de panel: "<badge?>|<retailer>|CLP <precio>|..."
-    Retorna (retailer, precio_str) o ("", "") si no se puede parsear.
-    """
-    parts = [p.strip() for p in text.split('|') if p.strip()]
-    retailer = ""
-    price_str = ""
-
-    for i, part in enumerate(parts):
-        if part.lower() in _PANEL_BADGES:
-            continue
-        if not retailer:
-            retailer = part
-            continue
-        if part.upper().startswith('CLP'):
-            price_str = part
-            break
-
-    return retailer, price_str
-
-
-async def scrape_google_shopping(search_term: str) -> list[dict]:
+from utils.artifacts import ArtifactRecorder
+from utils.block_detector import BlockDetector, BlockedError, GOOGLE_BLOCK_RULES
+from utils.browser_pool import get_browser_pool, close_browser_pools
+from utils.html_parser import MAX_MAIN_CARDS, parse_google_main_labels, parse_google_panel_rows
+from utils.launch_profiles import get_launch_profile
+from utils.rate_limiter import RateLimitExceeded, rate_limiter
+from utils.redis_client import close_redis
+from utils.resource_blocking import get_resource_policy, install_resource_blocking
+from utils.result_cache import CACHE_NEGATIVE, CACHE_OK, CACHE_SKIP, result_cache
+from utils.session_store import session_store
+from utils.single_flight import single_flight
+from utils.settings import env_float, env_int, env_str
+from utils.timing import StepTimer, get_timing_profile
+
+
+# Opciones del contexto para Google. Headless, args, viewport y user agent
+# vienen del perfil de lanzamiento (utils.launch_profiles).
+_CONTEXT_OPTIONS = {
+    "locale": 'es-CL',
+    "timezone_id": 'America/Santiago',
+    "geolocation": {'latitude': -33.4489, 'longitude': -70.6693},
+    "permissions": ['geolocation'],
+    "extra_http_headers": {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+        'Accept-Language': 'es-CL,es;q=0.9,en;q=0.8',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+    },
+}
+
+
+async def scrape_google_shopping(search_term: str, timing: str | None = None,
+                                 nav_mode: str | None = None, identity: str = "default",
+                                 task_id: str | None = None, use_cache: bool | None = None) -> list[dict]:
     """
     Busca un producto en Google Shopping y extrae precios de todos los vendedores.
 
     Estrategia:
-    1. Navega Google.cl → busca → pestaña Shopping (anti-bot con delays y stealth)
+    1. Llega a los resultados de Shopping por uno de dos caminos:
+       - fast: URL directa de resultados Shopping para el término
+       - humanlike: Google.cl → busca → pestaña Shopping (anti-bot con delays y stealth)
+       En modo "auto" se intenta fast y, si hay bloqueo o no hay resultados,
+       se cae automáticamente a humanlike.
     2. Abre el panel de un producto y hace clic en "Más tiendas"
     3. Extrae retailers del panel usando jsname="uwagwf" (estable, no depende de
        clases CSS ofuscadas que Google rota frecuentemente)
     4. Si el panel falla, extrae precios del resultado principal vía aria-label
 
+    Los resultados pasan por la caché de Redis (utils.result_cache) con el
+    término normalizado como clave: un hit no abre navegador. Las búsquedas
+    idénticas simultáneas comparten una sola ejecución (utils.single_flight).
+
     Args:
         search_term: Término de búsqueda (ej: "Leche Soprole Entera Natural 1 L")
+        timing: Perfil de timing (fast / humanlike / paranoid); por defecto TIMING_PROFILE
+        nav_mode: "auto", "fast" o "humanlike"; por defecto GOOGLE_NAV_MODE
+        identity: Identidad de sesión cuyo storage_state (cookies) se restaura
+            y guarda entre corridas
+        task_id: Identificador para nombrar artefactos de depuración (ARTIFACT_MODE)
+        use_cache: Consultar/guardar en la caché de resultados; por defecto CACHE_ENABLED
 
     Returns:
-        list: [{"retailer", "nombre", "precio", "url", "encontrado"}, ...]
+        list: [{"retailer", "nombre", "precio", "precio_clp", "url", "encontrado"}, ...]
+
+    Raises:
+        RateLimitExceeded: google.cl no admite otra solicitud de la identidad
+            dentro de RATE_LIMIT_MAX_WAIT; reintentar más tarde
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=False,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-accelerated-2d-canvas',
-                '--no-first-run',
-                '--no-zygote',
-                '--disable-gpu',
-                '--hide-scrollbars',
-                '--mute-audio',
-                '--disable-background-timer-throttling',
-                '--disable-backgrounding-occluded-windows',
-                '--disable-renderer-backgrounding',
-            ]
+    async def fetch():
+        return await single_flight.do(
+            "google", search_term,
+            lambda: _scrape_google_shopping(search_term, timing, nav_mode, identity, task_id),
         )
 
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080},
-            locale='es-CL',
-            timezone_id='America/Santiago',
-            geolocation={'latitude': -33.4489, 'longitude': -70.6693},
-            permissions=['geolocation'],
-            extra_http_headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'es-CL,es;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-        )
+    return await result_cache.get_or_fetch("google", search_term, fetch, _cache_outcome, use_cache)
 
-        page = await context.new_page()
 
-        stealth_config = Stealth()
-        await page.goto("about:blank")
-        stealth_config.apply_stealth_sync(page)
+async def _scrape_google_shopping(search_term: str, timing: str | None, nav_mode: str | None,
+                                  identity: str, task_id: str | None) -> list[dict]:
+    """Scraping sin caché (ver scrape_google_shopping)."""
+    return [offer async for offer in iter_google_shopping(search_term, timing, nav_mode, identity, task_id)]
 
-        try:
-            # 1. Navegar a Google.cl
-            print(f"[Google Shopping] Paso 1: Navegando a google.cl...")
-            await page.goto("https://www.google.cl", wait_until="domcontentloaded", timeout=30000)
-            await page.wait_for_load_state("networkidle", timeout=30000)
-            await page.wait_for_timeout(random.randint(2000, 3000))
-
-            # Simular comportamiento humano
-            print(f"[Google Shopping] Simulando comportamiento natural...")
-            for _ in range(random.randint(2, 4)):
-                await page.mouse.move(
-                    random.randint(100, 1000),
-                    random.randint(100, 800),
-                    steps=random.randint(10, 25)
-                )
-                await page.wait_for_timeout(random.randint(300, 800))
-            await page.evaluate('window.scrollTo({top: 150, behavior: "smooth"})')
-            await page.wait_for_timeout(random.randint(1000, 1500))
-
-            # 2. Buscar el producto
-            print(f"[Google Shopping] Paso 2: Buscando '{search_term}'...")
-            search_box = await page.wait_for_selector('textarea[name="q"], input[name="q"]', timeout=10000)
-            await search_box.click()
-            await page.wait_for_timeout(random.randint(400, 700))
-            for i, char in enumerate(search_term):
-                await search_box.type(char, delay=random.randint(80, 180))
-                if i > 0 and i % random.randint(8, 12) == 0:
-                    await page.wait_for_timeout(random.randint(200, 500))
-            await page.wait_for_timeout(random.randint(1500, 2500))
-            await search_box.press('Enter')
-            await page.wait_for_timeout(random.randint(5000, 7000))
-            await page.evaluate('window.scrollTo({top: 250, behavior: "smooth"})')
-            await page.wait_for_timeout(random.randint(2000, 3000))
-
-            # 3. Ir a la pestaña Shopping
-            print(f"[Google Shopping] Paso 3: Navegando a Shopping...")
-            shopping_selectors = [
-                'a[href*="tbm=shop"]',
-                'a:has-text("Shopping")',
-                'div[role="tab"]:has-text("Shopping")',
-                '[data-async-trigger="tbm_shop"]',
-            ]
-            shopping_button = None
-            for selector in shopping_selectors:
-                try:
-                    shopping_button = await page.wait_for_selector(selector, timeout=8000)
-                    if shopping_button:
-                        print(f"[Google Shopping] ✓ Botón Shopping: {selector}")
-                        break
-                except Exception:
-                    continue
-            if not shopping_button:
-                raise Exception("No se encontró el botón Shopping")
-
-            box = await shopping_button.bounding_box()
-            if box:
-                await page.mouse.move(
-                    box['x'] + box['width'] / 2,
-                    box['y'] + box['height'] / 2,
-                    steps=random.randint(5, 15)
-                )
-                await page.wait_for_timeout(random.randint(500, 1000))
-            await shopping_button.click()
-            print(f"[Google Shopping] ✓ Clic en Shopping exitoso")
-            await page.wait_for_timeout(random.randint(5000, 7000))
-            await page.evaluate('window.scrollTo({top: 300, behavior: "smooth"})')
-            await page.wait_for_timeout(random.randint(2000, 3000))
-
-            # Verificar CAPTCHA
-            content = await page.content()
-            if 'recaptcha' in content.lower() or 'captcha' in content.lower():
-                print("[Google Shopping] ⚠️  CAPTCHA detectado")
-                with open('/tmp/google_shopping_captcha.html', 'w', encoding='utf-8') as f:
-                    f.write(content)
-                await browser.close()
-                return [_error_result(page.url, "CAPTCHA")]
-
-            # 4. Abrir panel del primer producto
-            print("[Google Shopping] Paso 4: Abriendo panel del primer producto...")
-            try:
-                first_product = await page.wait_for_selector('[jsname="ZvZkAe"]', timeout=10000)
-                if first_product:
-                    box = await first_product.bounding_box()
-                    if box:
-                        await page.mouse.move(
-                            box['x'] + box['width'] / 2,
-                            box['y'] + box['height'] / 2,
-                            steps=random.randint(5, 10)
-                        )
-                        await page.wait_for_timeout(random.randint(500, 1000))
-                    await page.evaluate('(el) => el.click()', first_product)
-                    print("[Google Shopping] ✓ Producto clickeado, esperando panel...")
-                    await page.wait_for_timeout(random.randint(5000, 7000))
-            except Exception as e:
-                print(f"[Google Shopping] ⚠️  No se pudo abrir panel: {e}")
-
-            # 5. Clic en "Más tiendas" para cargar todos los retailers
-            print("[Google Shopping] Paso 5: Buscando 'Más tiendas'...")
-            try:
-                more_stores = await page.wait_for_selector(
-                    'span:has-text("Más tiendas"), div.ZFiwCf', timeout=5000
-                )
-                if more_stores:
-                    await page.evaluate('(el) => el.click()', more_stores)
-                    print("[Google Shopping] ✓ Clic en 'Más tiendas'")
-                    await page.wait_for_timeout(random.randint(3000, 5000))
-                    # Scroll dentro del panel para cargar todos
-                    await page.evaluate('''
-                        const panel = document.querySelector('[role="dialog"]') || document.querySelector('aside');
-                        if (panel) panel.scrollTop = panel.scrollHeight;
-                        else window.scrollTo({top: document.body.scrollHeight, behavior: "smooth"});
-                    ''')
-                    await page.wait_for_timeout(random.randint(2000, 3000))
-            except Exception:
-                print("[Google Shopping] ℹ️  Sin botón 'Más tiendas'")
-
-            await page.screenshot(path="/tmp/google_shopping.png")
-            print("[Google Shopping] Screenshot guardado en /tmp/google_shopping.png")
-
-            # 6. Extraer retailers del panel
-            # jsname="uwagwf" + role="listitem" es estable porque jsname es un
-            # identificador interno de Google, no una clase CSS ofuscada rotable.
-            results = await _extract_panel_results(page)
-
-            # Fallback: extraer del resultado principal via aria-label si el panel falla
-            if not results:
-                print("[Google Shopping] ℹ️  Panel vacío, extrayendo de resultados principales...")
-                results = await _extract_main_results(page)
-
-            await browser.close()
-
-            if not results:
-                with open('/tmp/google_shopping_no_results.html', 'w', encoding='utf-8') as f:
-                    f.write(content)
-                print("[Google Shopping] No se encontraron resultados. HTML guardado.")
-                return [_error_result("", "Sin resultados")]
-
-            print(f"\n[Google Shopping] Total vendedores: {len(results)}")
-            return results
 
+async def iter_google_shopping(search_term: str, timing: str | None = None, nav_mode: str | None = None,
+                               identity: str = "default", task_id: str | None = None):
+    """
+    Igual que scrape_google_shopping, pero entrega cada oferta apenas se parsea
+    del panel, mientras la sesión sigue abierta, para que el consumidor pueda
+    normalizar y guardar en paralelo. No pasa por la caché ni el single-flight.
+
+    Las filas visibles al abrir el panel se entregan antes de cargar "Más
+    tiendas"; luego solo las nuevas. Sin resultados, CAPTCHA o error se
+    entregan como un dict con "error"; si la falla ocurre después de algunas
+    ofertas, ese dict llega al final, para que la corrida se trate como fallida
+    (scrape_google_shopping no cachea resultados con errores). RateLimitExceeded
+    se propaga: el llamador debe reintentar más tarde (ver tasks.scraping).
+
+    Yields:
+        dict: {"retailer", "nombre", "precio", "precio_clp", "url", "encontrado"}
+    """
+    artifacts = ArtifactRecorder("google", task_id)
+    async with _google_session(identity) as (page, blocking):
+        timer = StepTimer(page, get_timing_profile(timing), BlockDetector(page, GOOGLE_BLOCK_RULES))
+        count = 0
+        try:
+            async for offer in _iter_in_page(page, search_term, timer, nav_mode, artifacts, identity=identity):
+                count += 1
+                yield offer
+            await session_store.save(page.context, "google", identity)
+            if not count:
+                yield _no_results()
+                return
+
+            print(f"\n[Google Shopping] Total vendedores: {count}")
+            print(f"[Google Shopping] Recursos: {blocking.summary()}")
+            print(f"[Google Shopping] Esperas: {timer.summary()}")
+
+        except BlockedError as e:
+            session_store.invalidate("google", identity)
+            yield _error_result(e.url or page.url, "CAPTCHA")
+        except RateLimitExceeded:
+            raise
         except Exception as e:
-            await browser.close()
             print(f"[Google Shopping] Error: {e}")
+            await artifacts.capture(page, "error", failed=True)
             import traceback
             traceback.print_exc()
-            return [_error_result("", str(e))]
+            yield _error_result("", str(e))
 
 
-async def _extract_panel_results(page) -> list[dict]:
+async def scrape_google_shopping_batch(terms, timing: str | None = None, nav_mode: str | None = None,
+                                       max_rotations: int | None = None, identity: str = "default"):
     """
-    Extrae retailers del panel lateral usando jsname="uwagwf".
-    Cada item tiene un link directo al producto en la tienda.
+    Busca muchos términos en una sola sesión de navegador ya "calentada".
+
+    Reutiliza el contexto (cookies, stealth) y, a partir del segundo término, la
+    caja de búsqueda de la propia página de resultados Shopping. Si aparece un
+    CAPTCHA, rota el contexto (nuevo BrowserContext) y reintenta el término;
+    tras `max_rotations` rotaciones (GOOGLE_BATCH_MAX_ROTATIONS) se detiene y
+    marca los términos pendientes como bloqueados. RateLimitExceeded corta el
+    lote: los términos ya entregados quedan hechos y el resto se reintenta.
+
+    Args:
+        terms: Iterable de términos de búsqueda
+        timing: Perfil de timing (fast / humanlike / paranoid)
+        nav_mode: "auto", "fast" o "humanlike"
+        max_rotations: Máximo de contextos nuevos por CAPTCHA
+        identity: Identidad de sesión (storage_state) a restaurar y guardar
+
+    Yields:
+        tuple: (término, [{"retailer", "nombre", "precio", "precio_clp", "url", "encontrado"}, ...])
+            a medida que cada término termina
     """
-    # jsname="uwagwf" identifica cada fila de retailer en el panel de precio.
-    # Más estable que las clases CSS como R5K7Cb que Google rota frecuentemente.
-    items = await page.query_selector_all('div[jsname="uwagwf"][role="listitem"]')
-    print(f"[Google Shopping] Panel: {len(items)} retailers encontrados")
+    if max_rotations is None:
+        max_rotations = env_int("GOOGLE_BATCH_MAX_ROTATIONS", 2)
+
+    pending = list(terms)
+    rotations = 0
+    batch_id = ArtifactRecorder("google").task_id
+    done = 0
+
+    while pending:
+        async with _google_session(identity) as (page, blocking):
+            timer = StepTimer(page, get_timing_profile(timing), BlockDetector(page, GOOGLE_BLOCK_RULES))
+            on_results_page = False
+            saved = False
+
+            while pending:
+                term = pending[0]
+                artifacts = ArtifactRecorder("google", f"{batch_id}-{done + 1}")
+                try:
+                    results = [
+                        offer async for offer in _iter_in_page(page, term, timer, nav_mode, artifacts,
+                                                               reuse_results_page=on_results_page,
+                                                               identity=identity)
+                    ]
+                    on_results_page = bool(results)
+                    if not saved:
+                        await session_store.save(page.context, "google", identity)
+                        saved = True
+                    if not results:
+                        results = [_no_results()]
+                except BlockedError as e:
+                    session_store.invalidate("google", identity)
+                    rotations += 1
+                    if rotations > max_rotations:
+                        print(f"[Google Shopping] ⛔ CAPTCHA tras {max_rotations} rotaciones, deteniendo lote")
+                        for blocked_term in pending:
+                            yield blocked_term, [_error_result(e.url or page.url, "CAPTCHA")]
+                        return
+                    print(f"[Google Shopping] ↻ Rotando contexto ({rotations}/{max_rotations})...")
+                    break
+                except RateLimitExceeded:
+                    raise
+                except Exception as e:
+                    print(f"[Google Shopping] Error en '{term}': {e}")
+                    await artifacts.capture(page, "error", failed=True)
+                    results = [_error_result("", str(e))]
+                    on_results_page = False
+
+                pending.pop(0)
+                done += 1
+                yield term, results
+                if pending:
+                    await timer.pause("between_terms", (1500, 4000))
+
+            print(f"[Google Shopping] Sesión de lote: {blocking.summary()} | {timer.summary()}")
+
+
+@asynccontextmanager
+async def _google_session(identity: str = "default"):
+    """
+    Abre un contexto del pool con stealth, bloqueo de recursos y la sesión
+    guardada de la identidad (si sigue vigente); entrega (page, blocking).
+    """
+    profile = get_launch_profile("google")
+    pool = get_browser_pool(f"google:{profile.name}", profile.launch_options("google"))
 
-    results = []
-    seen = set()
+    context_options = {**_CONTEXT_OPTIONS, **profile.context_options("google")}
+    storage_state = session_store.load("google", identity)
+    if storage_state:
+        print(f"[Google Shopping] Restaurando sesión '{identity}'")
+        context_options["storage_state"] = storage_state
 
-    for idx, item in enumerate(items):
+    async with pool.context(**context_options) as context:
+        blocking = await install_resource_blocking(context, get_resource_policy("google"))
+        page = await context.new_page()
+
+        stealth_config = Stealth()
+        await page.goto("about:blank")
+        stealth_config.apply_stealth_sync(page)
+
+        yield page, blocking
+
+
+async def _iter_in_page(page, search_term: str, timer: StepTimer, nav_mode: str | None,
+                        artifacts: ArtifactRecorder, reuse_results_page: bool = False,
+                        identity: str = "default"):
+    """
+    Lleva la página a los resultados Shopping del término (probando cada camino
+    de navegación en orden) y extrae las ofertas. Cada navegación pasa antes por
+    el rate limiter compartido de google.cl para la identidad. Entrega las
+    ofertas a medida que se parsean; no entrega nada si ningún camino dio
+    resultados y lanza BlockedError si el último camino quedó bloqueado.
+    """
+    paths = _navigation_paths(nav_mode)
+    if reuse_results_page:
+        paths = ["reuse"] + paths
+
+    for i, path in enumerate(paths):
+        has_fallback = i + 1 < len(paths)
+
+        # 1. Llegar a los resultados de Shopping, abortando apenas haya señales
+        # de bloqueo (redirect /sorry/, HTTP 429, iframe reCAPTCHA)
+        timer.detector.reset()
         try:
-            # El link tiene href al producto en la tienda y texto con retailer + precio
-            link = await item.query_selector('a[href]:not([href*="google.com"])')
-            if not link:
+            if path == "reuse":
+                await _search_from_results_page(page, search_term, timer, identity)
+            elif path == "fast":
+                await _navigate_direct(page, search_term, timer, identity)
+            else:
+                await _navigate_humanlike(page, search_term, timer, identity)
+            await timer.detector.check()
+        except BlockedError as e:
+            print(f"[Google Shopping] ⚠️  CAPTCHA detectado (camino {path}): {e.reason}")
+            timer.record_outcome(captcha=True)
+            _record_path(path, "blocked")
+            if has_fallback:
+                print("[Google Shopping] ↪ Reintentando por el siguiente camino...")
                 continue
+            await artifacts.capture(page, "captcha", failed=True)
+            raise
+        timer.record_outcome(captcha=False)
 
-            href = await link.get_attribute('href') or ''
-            text = await link.inner_text() or ''
-            text_pipe = '|'.join(t.strip() for t in text.split('\n') if t.strip())
+        # 2-3. Abrir panel, "Más tiendas" y extraer (un CAPTCHA aquí ya no
+        # tiene camino alternativo: se registra como bloqueo y se propaga)
+        found = 0
+        try:
+            async for offer in _iter_offers(page, timer, artifacts):
+                found += 1
+                yield offer
+        except BlockedError as e:
+            print(f"[Google Shopping] ⚠️  CAPTCHA detectado en el panel (camino {path}): {e.reason}")
+            timer.record_outcome(captcha=True)
+            _record_path(path, "blocked")
+            await artifacts.capture(page, "captcha", failed=True)
+            raise
+        if found:
+            _record_path(path, "success")
+            return
 
-            retailer, price_str = _parse_panel_link_text(text_pipe)
-            if not retailer or not price_str:
-                continue
+        _record_path(path, "empty")
+        if has_fallback:
+            print(f"[Google Shopping] ↪ Sin resultados (camino {path}), probando el siguiente...")
 
-            key = retailer.lower()
-            if key in seen:
-                continue
-            seen.add(key)
-
-            # Extraer nombre del producto del texto (parte después del precio)
-            product_name = ""
-            parts = [p.strip() for p in text_pipe.split('|') if p.strip()]
-            price_idx = next((i for i, p in enumerate(parts) if p.upper().startswith('CLP')), -1)
-            if price_idx >= 0 and price_idx + 1 < len(parts):
-                product_name = parts[price_idx + 1]
-
-            results.append({
-                "retailer": retailer,
-                "nombre": product_name,
-                "precio": price_str,
-                "sku": "N/A",
-                "url": href,
-                "encontrado": True
-            })
-            print(f"[Google Shopping] {len(results)}. {retailer}: {price_str}")
 
-        except Exception as e:
-            print(f"[Google Shopping] Error en item {idx+1}: {e}")
-            continue
+def _cache_outcome(results: list[dict]) -> str:
+    """Sin resultados se cachea como negativo; errores (CAPTCHA, timeouts) no se cachean."""
+    if len(results) == 1 and results[0].get("error") == "Sin resultados":
+        return CACHE_NEGATIVE
+    if any(result.get("error") for result in results):
+        return CACHE_SKIP
+    return CACHE_OK
 
-    return results
 
+def _no_results() -> dict:
+    print("[Google Shopping] No se encontraron resultados.")
+    return _error_result("", "Sin resultados")
 
-async def _extract_main_results(page) -> list[dict]:
+
+def _shopping_url(search_term: str) -> str:
+    return f"https://www.google.cl/search?q={quote_plus(search_term)}&tbm=shop&hl=es-419&gl=cl"
+
+
+# Éxitos, bloqueos y resultados vacíos por camino de navegación en este proceso
+NAV_PATH_STATS: dict[str, dict[str, int]] = {
+    "reuse": {"success": 0, "blocked": 0, "empty": 0},
+    "fast": {"success": 0, "blocked": 0, "empty": 0},
+    "humanlike": {"success": 0, "blocked": 0, "empty": 0},
+}
+
+# Últimos resultados por camino (ventana GOOGLE_FAST_PATH_WINDOW): la decisión
+# de omitir el camino rápido se toma sobre la ventana, no sobre el acumulado
+_NAV_PATH_RECENT: dict[str, deque] = {}
+
+# Búsquedas en "auto" desde que se desactivó el camino rápido (para los sondeos)
+_fast_path_skips = 0
+
+
+def _recent_outcomes(path: str) -> deque:
+    recent = _NAV_PATH_RECENT.get(path)
+    if recent is None:
+        recent = _NAV_PATH_RECENT[path] = deque(maxlen=max(1, env_int("GOOGLE_FAST_PATH_WINDOW", 50)))
+    return recent
+
+
+def _record_path(path: str, outcome: str) -> None:
+    NAV_PATH_STATS[path][outcome] += 1
+    _recent_outcomes(path).append(outcome)
+
+
+def nav_path_success_rate(path: str) -> float | None:
+    """Tasa de éxito del camino en la ventana reciente, o None si aún no hay intentos."""
+    recent = _recent_outcomes(path)
+    return recent.count("success") / len(recent) if recent else None
+
+
+def nav_path_metrics() -> dict[str, dict]:
+    """Intentos acumulados y tasa de éxito reciente por camino de navegación."""
+    return {
+        path: {
+            **stats,
+            "recent_attempts": len(_recent_outcomes(path)),
+            "recent_success_rate": nav_path_success_rate(path),
+        }
+        for path, stats in NAV_PATH_STATS.items()
+    }
+
+
+def _navigation_paths(nav_mode: str | None) -> list[str]:
     """
-    Fallback: extrae precios del resultado principal de la búsqueda vía aria-label.
-    No incluye URL directa al producto en la tienda.
+    Caminos a intentar en orden. En "auto" se omite el camino rápido si, con
+    suficientes intentos recientes, su tasa de éxito cae bajo
+    GOOGLE_FAST_PATH_MIN_SUCCESS; aun así, una de cada
+    GOOGLE_FAST_PATH_PROBE_EVERY búsquedas lo vuelve a probar, para que se
+    reactive solo cuando Google deje de bloquearlo.
+    """
+    global _fast_path_skips
+    mode = nav_mode or env_str("GOOGLE_NAV_MODE", "auto")
+    if mode == "fast":
+        return ["fast"]
+    if mode == "humanlike":
+        return ["humanlike"]
+
+    attempts = len(_recent_outcomes("fast"))
+    rate = nav_path_success_rate("fast")
+    min_samples = env_int("GOOGLE_FAST_PATH_MIN_SAMPLES", 10)
+    min_success = env_float("GOOGLE_FAST_PATH_MIN_SUCCESS", 0.6)
+    if attempts >= min_samples and rate is not None and rate < min_success:
+        _fast_path_skips += 1
+        if _fast_path_skips % max(1, env_int("GOOGLE_FAST_PATH_PROBE_EVERY", 10)) == 0:
+            print(f"[Google Shopping] Sondeando camino rápido (éxito reciente {rate:.0%})")
+            return ["fast", "humanlike"]
+        print(f"[Google Shopping] Camino rápido desactivado (éxito {rate:.0%} en {attempts} intentos recientes)")
+        return ["humanlike"]
+    _fast_path_skips = 0
+    return ["fast", "humanlike"]
+
+
+async def _navigate_direct(page, search_term: str, timer: StepTimer, identity: str = "default") -> None:
+    """Camino rápido: va directo a la URL de resultados Shopping del término."""
+    url = _shopping_url(search_term)
+    print(f"[Google Shopping] Paso 1 (rápido): {url}")
+    await rate_limiter.acquire(url, identity)
+    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+    await timer.wait("direct_results", selector=_MAIN_CARD_SELECTOR, network_idle=True, jitter=(500, 1200))
+
+
+async def _search_from_results_page(page, search_term: str, timer: StepTimer, identity: str = "default") -> None:
     """
-    cards = await page.query_selector_all('[jsname="ZvZkAe"]')
-    print(f"[Google Shopping] Resultados principales: {len(cards)} tarjetas")
+    Lote: reemplaza el término en la caja de búsqueda de la página de resultados
+    Shopping actual (se mantiene en la pestaña Shopping sin volver al home).
+    """
+    print(f"[Google Shopping] Paso 1 (reutilizando resultados): '{search_term}'")
+    await page.keyboard.press('Escape')
+    search_box = await page.wait_for_selector(_SEARCH_BOX_SELECTOR, timeout=10000)
+    await search_box.click()
+    await search_box.fill("")
+    await timer.pause("focus", (300, 600))
+    await search_box.type(search_term, delay=timer.typing_delay())
+    await timer.pause("before_enter", (500, 1200))
+    await rate_limiter.acquire("google.cl", identity)
+    await search_box.press('Enter')
+    await timer.wait("reuse_results", selector=_MAIN_CARD_SELECTOR, network_idle=True, jitter=(800, 1800))
+
+
+async def _navigate_humanlike(page, search_term: str, timer: StepTimer, identity: str = "default") -> None:
+    """Camino humano: home de Google.cl, tipeo del término y clic en la pestaña Shopping."""
+    # 1. Navegar a Google.cl
+    print(f"[Google Shopping] Paso 1: Navegando a google.cl...")
+    await rate_limiter.acquire("google.cl", identity)
+    await page.goto("https://www.google.cl", wait_until="domcontentloaded", timeout=30000)
+    await timer.wait("home", selector=_SEARCH_BOX_SELECTOR, network_idle=True, jitter=(2000, 3000))
+
+    # Simular comportamiento humano
+    print(f"[Google Shopping] Simulando comportamiento natural...")
+    for _ in range(timer.mouse_moves()):
+        await page.mouse.move(
+            random.randint(100, 1000),
+            random.randint(100, 800),
+            steps=random.randint(10, 25)
+        )
+        await timer.pause("mouse", (300, 800))
+    await page.evaluate('window.scrollTo({top: 150, behavior: "smooth"})')
+    await timer.pause("scroll", (1000, 1500))
+
+    # 2. Buscar el producto
+    print(f"[Google Shopping] Paso 2: Buscando '{search_term}'...")
+    search_box = await page.wait_for_selector(_SEARCH_BOX_SELECTOR, timeout=10000)
+    await search_box.click()
+    await timer.pause("focus", (400, 700))
+    for i, char in enumerate(search_term):
+        await search_box.type(char, delay=timer.typing_delay())
+        if i > 0 and i % random.randint(8, 12) == 0:
+            await timer.pause("typing", (200, 500))
+    await timer.pause("before_enter", (1500, 2500))
+    await rate_limiter.acquire("google.cl", identity)
+    await search_box.press('Enter')
+    await timer.wait("after_enter", selector=_SHOPPING_TAB_SELECTOR, network_idle=True, jitter=(800, 1800))
+    await page.evaluate('window.scrollTo({top: 250, behavior: "smooth"})')
+    await timer.pause("scroll", (600, 1200))
+
+    # 3. Ir a la pestaña Shopping
+    print(f"[Google Shopping] Paso 3: Navegando a Shopping...")
+    shopping_selectors = [
+        'a[href*="tbm=shop"]',
+        'a:has-text("Shopping")',
+        'div[role="tab"]:has-text("Shopping")',
+        '[data-async-trigger="tbm_shop"]',
+    ]
+    shopping_button = None
+    for selector in shopping_selectors:
+        try:
+            shopping_button = await timer.detector.guard(page.wait_for_selector(selector, timeout=8000))
+            if shopping_button:
+                print(f"[Google Shopping] ✓ Botón Shopping: {selector}")
+                break
+        except BlockedError:
+            raise
+        except Exception:
+            continue
+    if not shopping_button:
+        raise Exception("No se encontró el botón Shopping")
+
+    box = await shopping_button.bounding_box()
+    if box:
+        await page.mouse.move(
+            box['x'] + box['width'] / 2,
+            box['y'] + box['height'] / 2,
+            steps=random.randint(5, 15)
+        )
+        await timer.pause("hover", (500, 1000))
+    await rate_limiter.acquire("google.cl", identity)
+    await shopping_button.click()
+    print(f"[Google Shopping] ✓ Clic en Shopping exitoso")
+    await timer.wait("after_shopping", selector=_MAIN_CARD_SELECTOR, network_idle=True, jitter=(800, 1800))
+    await page.evaluate('window.scrollTo({top: 300, behavior: "smooth"})')
+    await timer.pause("scroll", (600, 1200))
+
 
-    results = []
+async def _iter_offers(page, timer: StepTimer, artifacts: ArtifactRecorder):
+    """
+    Desde la página de resultados Shopping: abre el panel del primer producto,
+    entrega las filas ya visibles, carga "Más tiendas" y entrega las nuevas.
+    Si el panel no trae filas, entrega las de los resultados principales.
+    """
+    # Una fila por retailer entre lecturas del panel, igual que parse_google_panel_rows
     seen = set()
 
-    for idx, card in enumerate(cards[:40]):
-        try:
-            label = await card.get_attribute('aria-label') or ''
-            m = _ARIA_PRICE_RE.match(label.strip())
-            if not m:
-                continue
+    def fresh(offers: list[dict]) -> list[dict]:
+        new = []
+        for offer in offers:
+            key = offer['retailer'].lower()
+            if key not in seen:
+                seen.add(key)
+                new.append(offer)
+        return new
+
+    # 4. Abrir panel del primer producto
+    print("[Google Shopping] Paso 4: Abriendo panel del primer producto...")
+    try:
+        first_product = await page.wait_for_selector(_MAIN_CARD_SELECTOR, timeout=10000)
+        if first_product:
+            box = await first_product.bounding_box()
+            if box:
+                await page.mouse.move(
+                    box['x'] + box['width'] / 2,
+                    box['y'] + box['height'] / 2,
+                    steps=random.randint(5, 10)
+                )
+                await timer.pause("hover", (500, 1000))
+            await page.evaluate('(el) => el.click()', first_product)
+            print("[Google Shopping] ✓ Producto clickeado, esperando panel...")
+            await timer.wait("panel_open", selector=_PANEL_READY_SELECTOR, jitter=(500, 1200))
+    except BlockedError:
+        raise
+    except Exception as e:
+        print(f"[Google Shopping] ⚠️  No se pudo abrir panel: {e}")
+
+    # Primeras filas del panel, antes de "Más tiendas"
+    for offer in fresh(await _extract_panel_results(page)):
+        yield offer
+
+    # 5. Clic en "Más tiendas" para cargar todos los retailers
+    print("[Google Shopping] Paso 5: Buscando 'Más tiendas'...")
+    try:
+        more_stores = await page.wait_for_selector(_MORE_STORES_SELECTOR, timeout=5000)
+        if more_stores:
+            await page.evaluate('(el) => el.click()', more_stores)
+            print("[Google Shopping] ✓ Clic en 'Más tiendas'")
+            await timer.wait("more_stores", selector=_PANEL_ROW_SELECTOR, network_idle=True, jitter=(400, 1000))
+            # Scroll dentro del panel para cargar todos
+            await page.evaluate('''
+                const panel = document.querySelector('[role="dialog"]') || document.querySelector('aside');
+                if (panel) panel.scrollTop = panel.scrollHeight;
+                else window.scrollTo({top: document.body.scrollHeight, behavior: "smooth"});
+            ''')
+            await timer.wait("panel_scroll", network_idle=True, jitter=(400, 1000))
+    except BlockedError:
+        raise
+    except Exception:
+        print("[Google Shopping] ℹ️  Sin botón 'Más tiendas'")
+
+    # 6. Extraer retailers del panel (solo los que no salieron antes)
+    # jsname="uwagwf" + role="listitem" es estable porque jsname es un
+    # identificador interno de Google, no una clase CSS ofuscada rotable.
+    await timer.detector.check()
+    for offer in fresh(await _extract_panel_results(page)):
+        yield offer
+
+    # Fallback: extraer del resultado principal via aria-label si el panel falla
+    if not seen:
+        print("[Google Shopping] ℹ️  Panel vacío, extrayendo de resultados principales...")
+        for offer in await _extract_main_results(page):
+            seen.add(offer['retailer'].lower())
+            yield offer
+
+    # Sin resultados siempre cuenta como falla; los éxitos solo si se muestrean
+    await artifacts.capture(page, "results", failed=not seen)
+
+
+# Selectores que marcan el fin de cada paso de navegación (esperas condicionadas)
+_SEARCH_BOX_SELECTOR = 'textarea[name="q"], input[name="q"]'
+_SHOPPING_TAB_SELECTOR = 'a[href*="tbm=shop"], a:has-text("Shopping"), div[role="tab"]:has-text("Shopping")'
+_MORE_STORES_SELECTOR = 'span:has-text("Más tiendas"), div.ZFiwCf'
+
+# Filas del panel de precios y tarjetas de resultados principales.
+# jsname="uwagwf" identifica cada fila de retailer en el panel de precio.
+# Más estable que las clases CSS como R5K7Cb que Google rota frecuentemente.
+_PANEL_ROW_SELECTOR = 'div[jsname="uwagwf"][role="listitem"]'
+_MAIN_CARD_SELECTOR = '[jsname="ZvZkAe"]'
+_PANEL_READY_SELECTOR = f'{_PANEL_ROW_SELECTOR}, {_MORE_STORES_SELECTOR}'
+
+# Lee href + texto del link de cada fila del panel en una sola llamada al navegador
+_PANEL_ROWS_JS = """
+rows => rows.map(row => {
+    const link = row.querySelector('a[href]:not([href*="google.com"])');
+    return link ? {href: link.getAttribute('href') || '', text: link.innerText || ''} : null;
+})
+"""
 
-            product_name = m.group(1).strip()
-            price_str = f"CLP {m.group(2).strip()}"
-            retailer = m.group(3).strip()
+# Lee los aria-label de las tarjetas principales en una sola llamada al navegador
+_MAIN_LABELS_JS = f"""
+cards => cards.slice(0, {MAX_MAIN_CARDS}).map(card => card.getAttribute('aria-label') || '')
+"""
 
-            if 'general' in retailer.lower() or 'precio' in retailer.lower():
-                continue
 
-            key = (retailer.lower(), m.group(2))
-            if key in seen:
-                continue
-            seen.add(key)
-
-            results.append({
-                "retailer": retailer,
-                "nombre": product_name,
-                "precio": price_str,
-                "sku": "N/A",
-                "url": "",
-                "encontrado": True
-            })
-            print(f"[Google Shopping] {len(results)}. {retailer}: {price_str}")
+async def _extract_panel_results(page) -> list[dict]:
+    """
+    Extrae retailers del panel lateral usando jsname="uwagwf".
+    Cada item tiene un link directo al producto en la tienda.
+    Los textos se leen en un solo page.$$eval y se parsean en Python.
+    """
+    rows = await page.eval_on_selector_all(_PANEL_ROW_SELECTOR, _PANEL_ROWS_JS)
+    print(f"[Google Shopping] Panel: {len(rows)} retailers encontrados")
+    results = parse_google_panel_rows(rows)
+    for i, result in enumerate(results, 1):
+        print(f"[Google Shopping] {i}. {result['retailer']}: {result['precio']}")
+    return results
 
-        except Exception as e:
-            print(f"[Google Shopping] Error en tarjeta {idx+1}: {e}")
-            continue
 
+async def _extract_main_results(page) -> list[dict]:
+    """
+    Fallback: extrae precios del resultado principal de la búsqueda vía aria-label.
+    No incluye URL directa al producto en la tienda.
+    Los aria-label se leen en un solo page.$$eval y se parsean en Python.
+    """
+    labels = await page.eval_on_selector_all(_MAIN_CARD_SELECTOR, _MAIN_LABELS_JS)
+    print(f"[Google Shopping] Resultados principales: {len(labels)} tarjetas")
+    results = parse_google_main_labels(labels)
+    for i, result in enumerate(results, 1):
+        print(f"[Google Shopping] {i}. {result['retailer']}: {result['precio']}")
     return results
 
 
@@ -363,6 +644,7 @@ def _error_result(url: str, error: str) -> dict:
         "retailer": "Google Shopping",
         "nombre": "Error",
         "precio": "N/A",
+        "precio_clp": None,
         "sku": "N/A",
         "url": url,
         "encontrado": False,
@@ -371,7 +653,14 @@ def _error_result(url: str, error: str) -> dict:
 
 
 if __name__ == "__main__":
-    results = asyncio.run(scrape_google_shopping("Leche Entera Natural Soprole 1L"))
+    async def _main():
+        try:
+            return await scrape_google_shopping("Leche Entera Natural Soprole 1L")
+        finally:
+            await close_browser_pools()
+            await close_redis()
+
+    results = asyncio.run(_main())
     print("\n=== Resultados de Google Shopping ===")
     for i, result in enumerate(results, 1):
         print(f"\n{i}. {result['retailer']}")
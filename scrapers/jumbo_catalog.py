@@ -6,129 +6,539 @@ Usa la URL de búsqueda directa para evitar detección.
 """
 
 import asyncio
-from playwright.async_api import async_playwright
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import quote
 
+from utils.artifacts import ArtifactRecorder
+from utils.block_detector import BlockDetector, BlockedError, JUMBO_BLOCK_RULES
+from utils.browser_pool import get_browser_pool, close_browser_pools
+from utils.launch_profiles import get_launch_profile
+from utils.process_metrics import process_tree_rss_bytes
+from utils.rate_limiter import RateLimitExceeded, rate_limiter
+from utils.redis_client import close_redis
+from utils.resource_blocking import get_resource_policy, install_resource_blocking
+from utils.result_cache import CACHE_NEGATIVE, CACHE_OK, CACHE_SKIP, result_cache
+from utils.session_store import session_store
+from utils.single_flight import single_flight
+from utils.html_parser import build_jumbo_products
+from utils.http_client import get_http_client, close_http_client
+from utils.settings import env_int, env_str
 
-async def scrape_jumbo_catalog(search_term: str):
+
+# Cada tarjeta de producto expone sus datos en atributos data-cnstrc-*
+_PRODUCT_CARD_SELECTOR = '[data-cnstrc-item-name]'
+
+# Extrae los datos crudos de todas las tarjetas en una sola llamada al navegador
+# (un único round trip CDP en vez de ~7 por tarjeta).
+_EXTRACT_CARDS_JS = """
+cards => cards.map(card => {
+    const link = card.querySelector('a[href*="/p"]');
+    const img = card.querySelector('img');
+    return {
+        id: card.getAttribute('data-cnstrc-item-id'),
+        name: card.getAttribute('data-cnstrc-item-name'),
+        price: card.getAttribute('data-cnstrc-item-price'),
+        href: link ? link.getAttribute('href') : null,
+        image: img ? img.getAttribute('src') : null,
+    };
+})
+"""
+
+
+async def scrape_jumbo_catalog(search_term: str, extraction: str = "bulk", identity: str = "default",
+                               mode: str | None = None, task_id: str | None = None,
+                               use_cache: bool | None = None):
     """
     Busca productos en Jumbo.cl por marca o categoría.
 
-    Usa la URL de búsqueda directa: https://www.jumbo.cl/busqueda?ft={term}
+    Dos backends:
+    - api: consulta directa al JSON de búsqueda (Constructor.io, el origen de los
+      atributos data-cnstrc-*) con el cliente HTTP compartido, sin navegador.
+    - browser: URL de búsqueda directa https://www.jumbo.cl/busqueda?ft={term}
+      renderizada en Chromium.
+    En modo "auto" se usa api y, si falla o no trae productos, browser.
+
+    El resultado pasa por la caché de Redis (utils.result_cache) con el término
+    normalizado como clave, y las búsquedas idénticas simultáneas comparten una
+    sola ejecución (utils.single_flight).
 
     Args:
         search_term: Término de búsqueda (ej: "Soprole", "Cereales")
+        extraction: "bulk" (un solo page.$$eval) o "handles" (una llamada por
+            atributo, modo anterior; se mantiene para benchmarks)
+        identity: Identidad de sesión cuyo storage_state (cookies/consentimiento)
+            se restaura y guarda entre corridas
+        mode: "auto", "api" o "browser"; por defecto JUMBO_SEARCH_MODE
+        task_id: Identificador para nombrar artefactos de depuración (ARTIFACT_MODE)
+        use_cache: Consultar/guardar en la caché de resultados; por defecto CACHE_ENABLED
 
     Returns:
         dict: Estado del scraping y lista de productos encontrados
+
+    Raises:
+        RateLimitExceeded: jumbo.cl (o la API en modo "api") no admite otra
+            solicitud dentro de RATE_LIMIT_MAX_WAIT; reintentar más tarde
+    """
+    async def fetch():
+        return await single_flight.do(
+            "jumbo", search_term,
+            lambda: _scrape_jumbo_catalog(search_term, extraction, identity, mode, task_id),
+        )
+
+    return await result_cache.get_or_fetch("jumbo", search_term, fetch, _cache_outcome, use_cache)
+
+
+def _cache_outcome(result: dict) -> str:
+    """Cero productos se cachea como negativo; los errores no se cachean."""
+    if result.get("status") != "success":
+        return CACHE_SKIP
+    return CACHE_OK if result.get("product_count") else CACHE_NEGATIVE
+
+
+async def _scrape_jumbo_catalog(search_term: str, extraction: str, identity: str,
+                                mode: str | None, task_id: str | None) -> dict:
+    """Scraping sin caché (ver scrape_jumbo_catalog)."""
+    mode = mode or env_str("JUMBO_SEARCH_MODE", "auto")
+    if mode in ("auto", "api"):
+        try:
+            products = await _fetch_products_api(search_term)
+            if products or mode == "api":
+                print(f"[Jumbo] API: {len(products)} productos")
+                return {
+                    "status": "success",
+                    "brand": search_term,
+                    "message": f"Búsqueda completada. {len(products)} productos encontrados.",
+                    "product_count": len(products),
+                    "products": products,
+                    "search_url": _search_url(search_term)
+                }
+            print("[Jumbo] API sin productos, usando navegador...")
+        except RateLimitExceeded as e:
+            # El navegador va a jumbo.cl, otro dominio con su propio límite
+            if mode == "api":
+                raise
+            print(f"[Jumbo] {e}, usando navegador...")
+        except Exception as e:
+            if mode == "api":
+                print(f"[Jumbo] Error API: {e}")
+                return {
+                    "status": "error",
+                    "brand": search_term,
+                    "message": str(e),
+                    "product_count": 0
+                }
+            print(f"[Jumbo] API no disponible ({e}), usando navegador...")
+
+    async with _jumbo_session(identity) as (context, blocking, restored):
+        result = await _search_in_context(context, search_term, extraction, identity, restored,
+                                          ArtifactRecorder("jumbo", task_id))
+        print(f"[Jumbo] Recursos: {blocking.summary()}")
+        if result["status"] == "success" and not restored:
+            await session_store.save(context, "jumbo", identity)
+        return result
+
+
+async def _search_in_context(context, search_term: str, extraction: str, identity: str,
+                             restored: bool, artifacts: ArtifactRecorder) -> dict:
+    """
+    Busca el término en una página nueva del contexto y retorna el dict de
+    resultado (status success/error). La página se cierra al terminar.
+    """
+    page = await context.new_page()
+    detector = BlockDetector(page, JUMBO_BLOCK_RULES)
+
+    try:
+        # 1. Ir directamente a la búsqueda de Jumbo
+        search_url = _search_url(search_term)
+        print(f"[Jumbo] Navegando a: {search_url}")
+        await rate_limiter.acquire(search_url, identity)
+        await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+
+        # Cerrar banner de cookies si aparece (con sesión restaurada ya fue aceptado)
+        if restored:
+            print("[Jumbo] Sesión restaurada, se omite banner de cookies")
+        else:
+            await _dismiss_cookie_banner(page)
+
+        # Esperar a que aparezcan los productos (aborta si hay bloqueo)
+        await _wait_for_products(page, detector)
+
+        # 2. Extraer productos usando los atributos data-cnstrc-*
+        # Jumbo usa estos atributos para datos de productos
+        valid_products = await _extract_products(page, extraction)
+
+        # 3. Screenshot + HTML para análisis según ARTIFACT_MODE
+        # (sin productos cuenta como falla)
+        await artifacts.capture(page, "search", failed=not valid_products)
+
+        print(f"[Jumbo] Encontrados {len(valid_products)} productos para '{search_term}'")
+
+        return {
+            "status": "success",
+            "brand": search_term,
+            "message": f"Búsqueda completada. {len(valid_products)} productos encontrados.",
+            "product_count": len(valid_products),
+            "products": valid_products,
+            "search_url": search_url
+        }
+
+    except BlockedError as e:
+        print(f"[Jumbo] ⚠️  {e}")
+        await artifacts.capture(page, "blocked", failed=True)
+        session_store.invalidate("jumbo", identity)
+        return {
+            "status": "error",
+            "brand": search_term,
+            "message": str(e),
+            "product_count": 0
+        }
+
+    except RateLimitExceeded:
+        raise
+
+    except Exception as e:
+        print(f"[Jumbo] Error: {e}")
+        await artifacts.capture(page, "error", failed=True)
+
+        import traceback
+        traceback.print_exc()
+
+        return {
+            "status": "error",
+            "brand": search_term,
+            "message": str(e),
+            "product_count": 0
+        }
+
+    finally:
+        await page.close()
+
+
+async def scrape_jumbo_catalog_many(terms, concurrency: int | None = None, extraction: str = "bulk",
+                                    identity: str = "default", task_id: str | None = None):
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        page = await browser.new_page()
+    Busca muchas marcas o categorías en paralelo dentro de un solo navegador.
 
+    Abre hasta `concurrency` páginas a la vez en un único contexto compartido
+    (mismas cookies, un solo Chromium del pool) y entrega cada resultado apenas
+    termina, sin esperar al resto. Al final informa páginas por segundo y el
+    peak de memoria (este proceso + Chromium).
+
+    Args:
+        terms: Iterable de términos de búsqueda
+        concurrency: Páginas simultáneas; por defecto JUMBO_MANY_CONCURRENCY
+        extraction: "bulk" o "handles" (ver scrape_jumbo_catalog)
+        identity: Identidad de sesión (storage_state)
+        task_id: Prefijo para los artefactos de depuración de cada término
+
+    Yields:
+        tuple: (término, dict de resultado como scrape_jumbo_catalog), a medida que terminan
+    """
+    terms = list(terms)
+    if not terms:
+        return
+    concurrency = max(1, concurrency or env_int("JUMBO_MANY_CONCURRENCY", 4))
+    batch_id = ArtifactRecorder("jumbo", task_id).task_id
+    semaphore = asyncio.Semaphore(concurrency)
+    peak_rss = process_tree_rss_bytes() or 0
+    start = time.perf_counter()
+
+    async with _jumbo_session(identity) as (context, blocking, restored):
+
+        async def search(n: int, term: str) -> tuple[str, dict]:
+            async with semaphore:
+                artifacts = ArtifactRecorder("jumbo", f"{batch_id}-{n}")
+                return term, await _search_in_context(context, term, extraction, identity, restored, artifacts)
+
+        async def sample_memory():
+            nonlocal peak_rss
+            while True:
+                peak_rss = max(peak_rss, process_tree_rss_bytes() or 0)
+                await asyncio.sleep(0.5)
+
+        sampler = asyncio.create_task(sample_memory())
+        tasks = [asyncio.create_task(search(n, term)) for n, term in enumerate(terms, 1)]
+        saved = restored
+        done = 0
         try:
-            # 1. Ir directamente a la búsqueda de Jumbo
-            search_url = f"https://www.jumbo.cl/busqueda?ft={search_term}"
-            print(f"[Jumbo] Navegando a: {search_url}")
-            await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+            for finished in asyncio.as_completed(tasks):
+                term, result = await finished
+                done += 1
+                if not saved and result["status"] == "success":
+                    await session_store.save(context, "jumbo", identity)
+                    saved = True
+                yield term, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            sampler.cancel()
+
+        elapsed = time.perf_counter() - start
+        peak_rss = max(peak_rss, process_tree_rss_bytes() or 0)
+        print(f"[Jumbo] Lote: {done} páginas en {elapsed:.1f}s "
+              f"({done / elapsed if elapsed else 0:.2f} pág/s, concurrencia {concurrency}), "
+              f"memoria máx {peak_rss / 1024 / 1024:.0f} MB")
+        print(f"[Jumbo] Recursos: {blocking.summary()}")
 
-            # Cerrar banner de cookies si aparece
-            print("[Jumbo] Verificando banner de cookies...")
+
+async def iter_jumbo_catalog(search_term: str, max_concurrent_pages: int | None = None,
+                             max_pages: int | None = None, extraction: str = "bulk",
+                             identity: str = "default"):
+    """
+    Recorre todas las páginas de resultados de búsqueda de Jumbo y entrega los
+    productos a medida que se parsea cada página.
+
+    La página 1 se carga sola (cookies, sesión y verificación de resultados);
+    las siguientes se piden en ventanas de `max_concurrent_pages` páginas en
+    paralelo dentro del mismo contexto. Se detiene en la primera página sin
+    productos nuevos. Los productos se deduplican por jumbo_id entre páginas.
+
+    Una página con error transitorio (timeout, red) se reintenta hasta
+    JUMBO_PAGE_RETRIES veces; si sigue fallando se omite y se informa al final
+    (no cuenta como fin del catálogo). Si fallan todas las páginas de una
+    ventana el recorrido se detiene.
+
+    Args:
+        search_term: Término de búsqueda (ej: "Soprole", "Cereales")
+        max_concurrent_pages: Páginas en paralelo (JUMBO_MAX_CONCURRENT_PAGES)
+        max_pages: Límite de páginas a recorrer (JUMBO_MAX_PAGES)
+        extraction: "bulk" o "handles" (ver scrape_jumbo_catalog)
+        identity: Identidad de sesión (storage_state)
+
+    Yields:
+        dict: {"name", "jumbo_id", "price", "url", "image_url"}
+    """
+    max_concurrent_pages = max(1, max_concurrent_pages or env_int("JUMBO_MAX_CONCURRENT_PAGES", 3))
+    max_pages = max_pages or env_int("JUMBO_MAX_PAGES", 50)
+    page_retries = max(0, env_int("JUMBO_PAGE_RETRIES", 2))
+    seen_ids = set()
+    failed_pages = []
+
+    async with _jumbo_session(identity) as (context, blocking, restored):
+
+        async def fetch_page(page_number: int, dismiss_cookies: bool = False) -> list[dict]:
+            page = await context.new_page()
+            detector = BlockDetector(page, JUMBO_BLOCK_RULES)
             try:
-                cookie_btn = await page.wait_for_selector(
-                    'button:has-text("Aceptar"), button:has-text("Acepto"), #onetrust-accept-btn-handler',
-                    timeout=3000
-                )
-                if cookie_btn:
-                    await cookie_btn.click()
-                    print("[Jumbo] Banner de cookies cerrado")
-                    await page.wait_for_timeout(1000)
-            except:
-                print("[Jumbo] No se encontró banner de cookies")
-
-            # Esperar a que aparezcan los productos
-            print("[Jumbo] Esperando a que carguen los productos...")
+                url = _search_url(search_term, page_number)
+                print(f"[Jumbo] Página {page_number}: {url}")
+                await rate_limiter.acquire(url, identity)
+                await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                if dismiss_cookies:
+                    await _dismiss_cookie_banner(page)
+                await _wait_for_products(page, detector)
+                return await _extract_products(page, extraction)
+            finally:
+                await page.close()
+
+        async def fetch_page_retrying(page_number: int) -> tuple[int, list[dict] | None]:
+            """fetch_page con reintentos; retorna (página, None) si falló todas las veces."""
+            for attempt in range(page_retries + 1):
+                try:
+                    return page_number, await fetch_page(page_number)
+                except (BlockedError, RateLimitExceeded):
+                    raise
+                except Exception as e:
+                    if attempt < page_retries:
+                        print(f"[Jumbo] Error en página {page_number}: {e} (reintento {attempt + 1}/{page_retries})")
+                        await asyncio.sleep(2 ** attempt)
+                    else:
+                        print(f"[Jumbo] ⚠️  Página {page_number} falló tras {attempt + 1} intentos: {e}")
+            return page_number, None
+
+        def new_products(products: list[dict]) -> list[dict]:
+            fresh = [p for p in products if p['jumbo_id'] not in seen_ids]
+            seen_ids.update(p['jumbo_id'] for p in fresh)
+            return fresh
+
+        first = new_products(await fetch_page(1, dismiss_cookies=not restored))
+        if not restored:
+            await session_store.save(context, "jumbo", identity)
+        for product in first:
+            yield product
+        if not first:
+            return
+
+        next_page = 2
+        while next_page <= max_pages:
+            window = range(next_page, min(next_page + max_concurrent_pages, max_pages + 1))
+            next_page = window.stop
+            exhausted = False
+            window_failures = 0
+
+            tasks = [asyncio.create_task(fetch_page_retrying(n)) for n in window]
             try:
-                await page.wait_for_selector('[data-cnstrc-item-name]', timeout=15000)
-            except:
-                # Si no aparecen con el selector, esperar un poco más
-                await page.wait_for_timeout(5000)
-
-            # 2. Guardar screenshot para verificar
-            await page.screenshot(path="/tmp/jumbo_search_results.png")
-            print(f"[Jumbo] Screenshot guardado en /tmp/jumbo_search_results.png")
-
-            # 3. Guardar HTML para análisis
-            content = await page.content()
-            with open('/tmp/jumbo_search.html', 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"[Jumbo] HTML guardado en /tmp/jumbo_search.html")
-
-            # 4. Extraer productos usando los atributos data-cnstrc-*
-            # Jumbo usa estos atributos para datos de productos
-            product_cards = await page.query_selector_all('[data-cnstrc-item-name]')
-
-            valid_products = []
-            seen_ids = set()
-
-            for card in product_cards:
-                item_id = await card.get_attribute('data-cnstrc-item-id')
-
-                # Evitar duplicados
-                if item_id and item_id not in seen_ids:
-                    seen_ids.add(item_id)
-
-                    # Extraer datos del producto
-                    name = await card.get_attribute('data-cnstrc-item-name')
-                    price = await card.get_attribute('data-cnstrc-item-price')
-
-                    # Obtener URL del producto
-                    link = await card.query_selector('a[href*="/p"]')
-                    url = await link.get_attribute('href') if link else None
-
-                    # Obtener imagen
-                    img = await card.query_selector('img')
-                    image_url = await img.get_attribute('src') if img else None
-
-                    valid_products.append({
-                        'name': name,
-                        'jumbo_id': item_id,
-                        'price': int(price) if price else None,
-                        'url': f"https://www.jumbo.cl{url}" if url and not url.startswith('http') else url,
-                        'image_url': image_url
-                    })
-
-            print(f"[Jumbo] Encontrados {len(valid_products)} productos")
-
-            await browser.close()
-
-            return {
-                "status": "success",
-                "brand": search_term,
-                "message": f"Búsqueda completada. {len(valid_products)} productos encontrados.",
-                "product_count": len(valid_products),
-                "products": valid_products,
-                "search_url": search_url
-            }
+                for finished in asyncio.as_completed(tasks):
+                    page_number, products = await finished
+                    if products is None:
+                        failed_pages.append(page_number)
+                        window_failures += 1
+                        continue
+                    fresh = new_products(products)
+                    if not fresh:
+                        exhausted = True
+                    for product in fresh:
+                        yield product
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            if window_failures == len(window):
+                print(f"[Jumbo] ⛔ Fallaron las páginas {window.start}-{window.stop - 1}, deteniendo recorrido")
+                break
+            if exhausted:
+                break
+
+        if failed_pages:
+            print(f"[Jumbo] ⚠️  Recorrido incompleto: {len(seen_ids)} productos, "
+                  f"páginas fallidas {sorted(failed_pages)}")
+        else:
+            print(f"[Jumbo] Recorrido completo: {len(seen_ids)} productos en {next_page - 1} páginas")
+        print(f"[Jumbo] Recursos: {blocking.summary()}")
+
+
+async def _fetch_products_api(search_term: str, page_number: int = 1) -> list[dict]:
+    """
+    Consulta el JSON de búsqueda de Jumbo (Constructor.io) y lo mapea a productos.
+
+    Configuración (.env):
+        JUMBO_SEARCH_API_URL  Base del backend (python -m benchmarks.jumbo_api_stub
+                              lo apunta a un servidor local con JSON grabado)
+        JUMBO_CNSTRC_KEY      API key pública del sitio (la usa el frontend de Jumbo)
+        JUMBO_API_PAGE_SIZE   Resultados por página
+    """
+    key = env_str("JUMBO_CNSTRC_KEY", "")
+    if not key:
+        raise RuntimeError("JUMBO_CNSTRC_KEY no configurada")
+
+    base_url = env_str("JUMBO_SEARCH_API_URL", "https://ac.cnstrc.com").rstrip("/")
+    await rate_limiter.acquire(base_url)
+    response = await get_http_client().get(
+        f"{base_url}/search/{quote(search_term, safe='')}",
+        params={
+            "key": key,
+            "page": page_number,
+            "num_results_per_page": env_int("JUMBO_API_PAGE_SIZE", 40),
+        },
+    )
+    response.raise_for_status()
+    return _products_from_search_json(response.json())
 
-        except Exception as e:
-            print(f"[Jumbo] Error: {e}")
-            await page.screenshot(path="/tmp/jumbo_error.png")
-            await browser.close()
 
-            import traceback
-            traceback.print_exc()
+def _products_from_search_json(payload: dict) -> list[dict]:
+    """Mapea la respuesta de búsqueda de Constructor.io al mismo dict de producto del navegador."""
+    raw_cards = []
+    for result in payload.get("response", {}).get("results", []):
+        data = result.get("data") or {}
+        raw_cards.append({
+            'id': data.get("id"),
+            'name': result.get("value"),
+            'price': data.get("price"),
+            'href': data.get("url"),
+            'image': data.get("image_url"),
+        })
+    return build_jumbo_products(raw_cards)
 
-            return {
-                "status": "error",
-                "brand": search_term,
-                "message": str(e),
-                "product_count": 0
-            }
+
+def _search_url(search_term: str, page_number: int = 1) -> str:
+    url = f"https://www.jumbo.cl/busqueda?ft={search_term}"
+    return url if page_number <= 1 else f"{url}&page={page_number}"
+
+
+@asynccontextmanager
+async def _jumbo_session(identity: str = "default"):
+    """
+    Abre un contexto del pool con bloqueo de recursos y la sesión guardada de
+    la identidad (si sigue vigente); entrega (context, blocking, restaurada).
+    """
+    profile = get_launch_profile("jumbo")
+    pool = get_browser_pool(f"jumbo:{profile.name}", profile.launch_options("jumbo"))
+    storage_state = session_store.load("jumbo", identity)
+    context_options = profile.context_options("jumbo")
+    if storage_state:
+        context_options["storage_state"] = storage_state
+
+    async with pool.context(**context_options) as context:
+        blocking = await install_resource_blocking(context, get_resource_policy("jumbo"))
+        yield context, blocking, bool(storage_state)
+
+
+async def _dismiss_cookie_banner(page) -> None:
+    print("[Jumbo] Verificando banner de cookies...")
+    try:
+        cookie_btn = await page.wait_for_selector(
+            'button:has-text("Aceptar"), button:has-text("Acepto"), #onetrust-accept-btn-handler',
+            timeout=3000
+        )
+        if cookie_btn:
+            await cookie_btn.click()
+            print("[Jumbo] Banner de cookies cerrado")
+            await page.wait_for_timeout(1000)
+    except Exception:
+        print("[Jumbo] No se encontró banner de cookies")
+
+
+async def _wait_for_products(page, detector: BlockDetector) -> None:
+    print("[Jumbo] Esperando a que carguen los productos...")
+    try:
+        await detector.guard(page.wait_for_selector(_PRODUCT_CARD_SELECTOR, timeout=15000))
+    except BlockedError:
+        raise
+    except Exception:
+        # Si no aparecen con el selector, esperar un poco más
+        await detector.guard(page.wait_for_timeout(5000))
+    await detector.check()
+
+
+async def _extract_products(page, extraction: str = "bulk") -> list[dict]:
+    """Extrae los productos de la página de resultados."""
+    if extraction == "handles":
+        raw_cards = await _extract_raw_cards_handles(page)
+    else:
+        raw_cards = await page.eval_on_selector_all(_PRODUCT_CARD_SELECTOR, _EXTRACT_CARDS_JS)
+    return build_jumbo_products(raw_cards)
+
+
+async def _extract_raw_cards_handles(page) -> list[dict]:
+    """
+    Extracción tarjeta por tarjeta con ElementHandles (hasta 7 round trips por tarjeta).
+    """
+    product_cards = await page.query_selector_all(_PRODUCT_CARD_SELECTOR)
+
+    raw_cards = []
+    seen_ids = set()
+
+    for card in product_cards:
+        item_id = await card.get_attribute('data-cnstrc-item-id')
+        if not item_id or item_id in seen_ids:
+            continue
+        seen_ids.add(item_id)
+
+        link = await card.query_selector('a[href*="/p"]')
+        img = await card.query_selector('img')
+        raw_cards.append({
+            'id': item_id,
+            'name': await card.get_attribute('data-cnstrc-item-name'),
+            'price': await card.get_attribute('data-cnstrc-item-price'),
+            'href': await link.get_attribute('href') if link else None,
+            'image': await img.get_attribute('src') if img else None,
+        })
+
+    return raw_cards
 
 
 # Función de prueba
 if __name__ == "__main__":
-    result = asyncio.run(scrape_jumbo_catalog("Soprole"))
+    async def _main():
+        try:
+            return await scrape_jumbo_catalog("Soprole")
+        finally:
+            await close_browser_pools()
+            await close_http_client()
+            await close_redis()
+
+    result = asyncio.run(_main())
     print("\n=== Resultado del scraping de Jumbo ===")
     print(f"Estado: {result['status']}")
     print(f"Marca: {result['brand']}")
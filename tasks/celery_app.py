@@ -0,0 +1,37 @@
+"""
+Aplicación Celery del scraper
+
+Iniciar un worker:
+    celery -A tasks.celery_app worker --loglevel=info --concurrency=2
+
+Cada proceso del worker mantiene su propio event loop y navegadores (ver
+tasks.worker_loop), así que --concurrency define cuántos Chromium "calientes"
+hay por máquina.
+"""
+
+from celery import Celery
+
+from utils.settings import env_int, env_str
+
+
+app = Celery(
+    "simplify_scraper",
+    broker=env_str("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+    backend=env_str("CELERY_RESULT_BACKEND", "redis://localhost:6379/0"),
+    include=["tasks.scraping"],
+)
+
+app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    timezone="America/Santiago",
+    # Tareas largas y pesadas: un mensaje a la vez por proceso, ack al terminar
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_time_limit=env_int("TASK_TIME_LIMIT", 600),
+    task_soft_time_limit=env_int("TASK_SOFT_TIME_LIMIT", 540),
+)
+
+# Registra las señales de inicio/cierre del loop por proceso
+import tasks.worker_loop  # noqa: E402,F401
@@ -0,0 +1,113 @@
+"""
+Tareas de scraping
+
+Cada tarea envía la corrutina del scraper al event loop persistente del proceso
+(tasks.worker_loop), reutilizando navegadores y conexiones entre tareas.
+
+Con RESULT_SINK_ENABLED=true los productos y ofertas encontrados se envían
+además a la API por lotes (utils.result_sink), compartiendo el buffer entre
+todas las tareas del proceso. Con PRICE_HISTORY_ENABLED=true los precios se
+registran en el historial local (utils.price_history), que solo escribe cambios.
+
+Si el rate limiter compartido rechaza una navegación (RateLimitExceeded), la
+tarea se reprograma con self.retry(countdown=retry_after) en vez de salir sin
+límite; el lote de Google reintenta solo los términos pendientes y arrastra los
+ya terminados en el kwarg `collected` hasta el resultado final.
+"""
+
+import asyncio
+
+from tasks.celery_app import app
+from tasks.worker_loop import run_in_worker_loop
+from scrapers.google_shopping import scrape_google_shopping, scrape_google_shopping_batch
+from scrapers.jumbo_catalog import scrape_jumbo_catalog
+from utils.price_history import PriceHistory
+from utils.rate_limiter import RateLimitExceeded
+from utils.result_sink import get_result_sink
+from utils.settings import env_bool
+
+
+_price_history: PriceHistory | None = None
+
+
+def _history() -> PriceHistory | None:
+    global _price_history
+    if not env_bool("PRICE_HISTORY_ENABLED", False):
+        return None
+    if _price_history is None:
+        _price_history = PriceHistory()
+    return _price_history
+
+
+async def _deliver(records: list[dict]) -> None:
+    if records and env_bool("RESULT_SINK_ENABLED", False):
+        await get_result_sink().put_many(records)
+
+
+async def _jumbo_and_deliver(search_term: str, **options) -> dict:
+    result = await scrape_jumbo_catalog(search_term, **options)
+    await _deliver([
+        {"retailer": "Jumbo", "search_term": search_term, **product}
+        for product in result.get("products", [])
+    ])
+    history = _history()
+    if history and result.get("products"):
+        await asyncio.to_thread(history.record_jumbo_products, result["products"])
+    return result
+
+
+async def _google_and_deliver(search_term: str, **options) -> list[dict]:
+    results = await scrape_google_shopping(search_term, **options)
+    await _deliver([{"search_term": search_term, **offer} for offer in results if offer.get("encontrado")])
+    history = _history()
+    if history:
+        await asyncio.to_thread(history.record_google_offers, results, search_term)
+    return results
+
+
+@app.task(bind=True, name="scraper.jumbo_catalog")
+def scrape_jumbo_catalog_task(self, search_term: str, **options) -> dict:
+    """Catálogo de Jumbo para una marca o categoría."""
+    try:
+        return run_in_worker_loop(_jumbo_and_deliver(search_term, task_id=self.request.id, **options))
+    except RateLimitExceeded as e:
+        raise self.retry(exc=e, countdown=e.retry_after)
+
+
+@app.task(bind=True, name="scraper.google_shopping")
+def scrape_google_shopping_task(self, search_term: str, **options) -> list[dict]:
+    """Precios de todos los vendedores de un producto en Google Shopping."""
+    try:
+        return run_in_worker_loop(_google_and_deliver(search_term, task_id=self.request.id, **options))
+    except RateLimitExceeded as e:
+        raise self.retry(exc=e, countdown=e.retry_after)
+
+
+@app.task(bind=True, name="scraper.google_shopping_batch")
+def scrape_google_shopping_batch_task(self, terms: list[str], collected: list[dict] | None = None,
+                                      **options) -> list[dict]:
+    """
+    Varios términos de Google Shopping en una sola sesión de navegador.
+
+    `collected` lleva los términos terminados en intentos anteriores (reintento
+    por RateLimitExceeded): se reintentan solo los pendientes y el resultado
+    final los incluye a todos.
+    """
+    collected = list(collected or [])
+    done_before = len(collected)
+    history = _history()
+
+    async def collect():
+        async for term, results in scrape_google_shopping_batch(terms, **options):
+            await _deliver([{"search_term": term, **offer} for offer in results if offer.get("encontrado")])
+            if history:
+                await asyncio.to_thread(history.record_google_offers, results, term)
+            collected.append({"term": term, "results": results})
+        return collected
+
+    try:
+        return run_in_worker_loop(collect())
+    except RateLimitExceeded as e:
+        pending = terms[len(collected) - done_before:]
+        raise self.retry(exc=e, countdown=e.retry_after, args=[pending],
+                         kwargs={**options, "collected": collected})
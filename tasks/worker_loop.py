@@ -0,0 +1,141 @@
+"""
+Event loop persistente por proceso worker
+
+Cada proceso de Celery arranca (en worker_process_init) un thread con un event
+loop de asyncio que vive todo lo que vive el proceso. Las tareas envían sus
+corrutinas a ese loop con run_in_worker_loop(), así que Playwright, el pool de
+navegadores y el cliente HTTP se crean una sola vez por proceso y el costo por
+tarea es solo el trabajo de página.
+
+Configuración (.env):
+    WORKER_WARM_RETAILERS=jumbo,google   Navegadores a lanzar al iniciar el proceso (en
+                                         segundo plano: el hijo reporta UP sin esperarlos)
+    TASK_SOFT_TIME_LIMIT=540             La espera de cada corrutina termina 10 s antes (s)
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from utils.settings import env_int, env_str
+
+
+class WorkerLoop:
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run, name="scraper-event-loop", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, timeout: float | None = None):
+        """Ejecuta la corrutina en el loop del proceso y espera su resultado."""
+        if not self.running:
+            # Pools sin worker_process_init (ej: --pool=solo) arrancan al primer uso
+            self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timeout propio, SoftTimeLimitExceeded de Celery u otra interrupción del
+            # thread: la corrutina no debe seguir ocupando un navegador del pool
+            future.cancel()
+            raise
+
+    def submit_nowait(self, coro) -> "concurrent.futures.Future":
+        """Agenda la corrutina en el loop del proceso sin esperar su resultado."""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self) -> None:
+        with self._lock:
+            if not self.running:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(_shutdown(), self.loop).result(30)
+            except Exception as e:
+                print(f"[WorkerLoop] Error al cerrar recursos: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(10)
+            self._thread = None
+
+
+async def _warm_up(retailers: list[str]) -> None:
+    """Lanza un navegador por retailer para que la primera tarea no pague el arranque."""
+    from utils.browser_pool import get_browser_pool
+    from utils.launch_profiles import get_launch_profile
+
+    warmed = []
+    for retailer in retailers:
+        try:
+            profile = get_launch_profile(retailer)
+            pool = get_browser_pool(f"{retailer}:{profile.name}", profile.launch_options(retailer))
+            async with pool.browser():
+                pass
+            warmed.append(retailer)
+        except Exception as e:
+            print(f"[WorkerLoop] No se pudo precalentar {retailer}: {e}")
+    if warmed:
+        print(f"[WorkerLoop] Navegadores precalentados: {', '.join(warmed)}")
+
+
+async def _shutdown() -> None:
+    from utils.browser_pool import close_browser_pools
+    from utils.http_client import close_http_client
+    from utils.redis_client import close_redis
+    from utils.result_sink import close_result_sink
+
+    await close_browser_pools()
+    # El sink usa el cliente HTTP: se vacía antes de cerrarlo
+    await close_result_sink()
+    await close_http_client()
+    await close_redis()
+
+
+worker_loop = WorkerLoop()
+
+
+def run_in_worker_loop(coro, timeout: float | None = None):
+    """
+    Punto de entrada de las tareas: corre `coro` en el loop persistente del proceso.
+    Por defecto espera hasta 10 s antes del soft time limit de Celery, para
+    cancelar la corrutina antes de que el límite interrumpa la tarea.
+    """
+    if timeout is None:
+        timeout = max(1, env_int("TASK_SOFT_TIME_LIMIT", 540) - 10)
+    return worker_loop.submit(coro, timeout)
+
+
+@worker_process_init.connect
+def _on_worker_process_init(**kwargs):
+    worker_loop.start()
+    retailers = [r.strip() for r in env_str("WORKER_WARM_RETAILERS", "").split(",") if r.strip()]
+    if retailers:
+        # Sin esperar: prefork mata al hijo que no reporta UP dentro de
+        # worker_proc_alive_timeout (4 s por defecto), y lanzar Chromium tarda más.
+        # Una tarea que llegue antes de que termine toma otro navegador del pool.
+        worker_loop.submit_nowait(_warm_up(retailers))
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs):
+    worker_loop.stop()
@@ -0,0 +1,96 @@
+"""
+Artefactos de depuración (screenshots y HTML) según política
+
+Modos (ARTIFACT_MODE en .env):
+- off: nunca guarda artefactos
+- on-failure: solo cuando el scraping falla (CAPTCHA, sin resultados, error). Por defecto.
+- sampled:N: en fallas y además en un N% de las tareas exitosas (ej: sampled:5)
+- always: en todas las tareas
+
+La escritura ocurre en un thread (asyncio.to_thread) para no bloquear el event
+loop; el HTML se guarda comprimido con gzip y los screenshots en JPEG. Los
+nombres incluyen scraper y task_id para no pisarse entre tareas concurrentes:
+
+    {ARTIFACT_DIR}/{scraper}/{task_id}-{label}.html.gz
+    {ARTIFACT_DIR}/{scraper}/{task_id}-{label}.jpg
+"""
+
+import asyncio
+import gzip
+import random
+import time
+import uuid
+from pathlib import Path
+
+from utils.settings import env_int, env_str
+
+
+def _parse_mode(mode: str) -> tuple[str, float]:
+    """Retorna (modo, porcentaje de muestreo de éxitos)."""
+    mode = (mode or "on-failure").strip().lower()
+    if mode.startswith("sampled"):
+        _, _, pct = mode.partition(":")
+        try:
+            return "sampled", max(0.0, min(100.0, float(pct.rstrip("%") or 1)))
+        except ValueError:
+            return "sampled", 1.0
+    if mode in ("off", "on-failure", "always"):
+        return mode, 0.0
+    print(f"[Artifacts] Modo desconocido '{mode}', usando on-failure")
+    return "on-failure", 0.0
+
+
+def _write_file(path: Path, data: bytes, compress: bool) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress:
+        data = gzip.compress(data, compresslevel=6)
+    path.write_bytes(data)
+
+
+class ArtifactRecorder:
+    """
+    Guarda artefactos de una tarea de scraping según la política configurada.
+    La decisión de muestreo se toma una vez por tarea.
+    """
+
+    def __init__(self, scraper: str, task_id: str | None = None, mode: str | None = None,
+                 base_dir: str | None = None):
+        self.scraper = scraper
+        self.task_id = task_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.mode, sample_pct = _parse_mode(mode or env_str("ARTIFACT_MODE", "on-failure"))
+        self.base_dir = Path(base_dir or env_str("ARTIFACT_DIR", "/tmp/scraper-artifacts"))
+        self.sampled = self.mode == "always" or (self.mode == "sampled" and random.uniform(0, 100) < sample_pct)
+        self.saved: list[str] = []
+
+    def should_capture(self, failed: bool) -> bool:
+        if self.mode == "off":
+            return False
+        return failed or self.sampled
+
+    def _path(self, label: str, suffix: str) -> Path:
+        return self.base_dir / self.scraper / f"{self.task_id}-{label}{suffix}"
+
+    async def capture(self, page, label: str, failed: bool = False, html: bool = True,
+                      screenshot: bool = True) -> None:
+        """Screenshot + HTML de la página, si la política lo indica."""
+        if not self.should_capture(failed):
+            return
+        try:
+            if screenshot:
+                image = await page.screenshot(type="jpeg", quality=env_int("ARTIFACT_JPEG_QUALITY", 60))
+                await self._save(self._path(label, ".jpg"), image, compress=False)
+            if html:
+                await self.save_html(label, await page.content(), failed=failed)
+        except Exception as e:
+            print(f"[Artifacts] No se pudo capturar '{label}': {e}")
+
+    async def save_html(self, label: str, content: str, failed: bool = False) -> None:
+        """Guarda un HTML ya obtenido (gzip), si la política lo indica."""
+        if not self.should_capture(failed):
+            return
+        await self._save(self._path(label, ".html.gz"), content.encode("utf-8"), compress=True)
+
+    async def _save(self, path: Path, data: bytes, compress: bool) -> None:
+        await asyncio.to_thread(_write_file, path, data, compress)
+        self.saved.append(str(path))
+        print(f"[Artifacts] Guardado {path}")
@@ -0,0 +1,129 @@
+"""
+Detección temprana de bloqueos y CAPTCHAs
+
+Observa la página mientras se navega, sin serializar el DOM:
+- navegaciones del frame principal a URLs de bloqueo (ej: /sorry/ de Google)
+- respuestas de documento con status de bloqueo (429, 403)
+- iframes de CAPTCHA, buscados con un selector puntual en check()
+
+Apenas aparece una señal se marca el evento `blocked`; los pasos que corren
+bajo guard() (y las esperas de StepTimer) se abortan en ese momento con
+BlockedError en vez de agotar sus timeouts.
+
+Uso:
+    detector = BlockDetector(page, GOOGLE_BLOCK_RULES)
+    await detector.guard(page.wait_for_selector(...))
+    await detector.check()   # lanza BlockedError si hay señales
+"""
+
+import asyncio
+from dataclasses import dataclass
+
+
+class BlockedError(Exception):
+    """La sesión fue bloqueada (CAPTCHA, rate limit, challenge)."""
+
+    def __init__(self, reason: str, url: str = ""):
+        super().__init__(f"Bloqueado: {reason}")
+        self.reason = reason
+        self.url = url
+
+
+@dataclass(frozen=True)
+class BlockRules:
+    name: str
+    url_markers: tuple[str, ...] = ()
+    block_statuses: frozenset[int] = frozenset({429})
+    captcha_selector: str = ""
+
+
+GOOGLE_BLOCK_RULES = BlockRules(
+    name="google",
+    url_markers=("/sorry/", "google.com/sorry", "google.cl/sorry"),
+    block_statuses=frozenset({429}),
+    captcha_selector='iframe[src*="recaptcha"], #captcha-form, form[action*="/sorry/"]',
+)
+
+JUMBO_BLOCK_RULES = BlockRules(
+    name="jumbo",
+    url_markers=("/captcha", "/challenge", "cdn-cgi/challenge-platform"),
+    block_statuses=frozenset({403, 429}),
+    captcha_selector=(
+        'iframe[src*="captcha"], iframe[src*="challenges.cloudflare.com"], '
+        '#challenge-form, #px-captcha'
+    ),
+)
+
+
+class BlockDetector:
+    def __init__(self, page, rules: BlockRules):
+        self.page = page
+        self.rules = rules
+        self.blocked = asyncio.Event()
+        self.reason = ""
+        self.url = ""
+        page.on("framenavigated", self._on_frame_navigated)
+        page.on("response", self._on_response)
+
+    def _flag(self, reason: str, url: str) -> None:
+        if self.blocked.is_set():
+            return
+        self.reason = reason
+        self.url = url
+        self.blocked.set()
+        print(f"[BlockDetector:{self.rules.name}] ⚠️  {reason} ({url[:100]})")
+
+    def _on_frame_navigated(self, frame) -> None:
+        if frame != self.page.main_frame:
+            return
+        if any(marker in frame.url for marker in self.rules.url_markers):
+            self._flag("redirect de bloqueo", frame.url)
+
+    def _on_response(self, response) -> None:
+        # Solo documentos: un 429 de un script de analytics no es un bloqueo
+        if response.status in self.rules.block_statuses and response.request.resource_type == "document":
+            self._flag(f"HTTP {response.status}", response.url)
+
+    def reset(self) -> None:
+        """Limpia las señales (ej: antes de reintentar por otro camino)."""
+        self.blocked.clear()
+        self.reason = ""
+        self.url = ""
+
+    def raise_if_blocked(self) -> None:
+        if self.blocked.is_set():
+            raise BlockedError(self.reason, self.url)
+
+    async def check(self) -> None:
+        """Revisa eventos ya observados y, si no hay, busca un iframe/form de CAPTCHA."""
+        self.raise_if_blocked()
+        if self.rules.captcha_selector:
+            try:
+                if await self.page.query_selector(self.rules.captcha_selector):
+                    self._flag("CAPTCHA en página", self.page.url)
+            except Exception:
+                pass
+        self.raise_if_blocked()
+
+    async def guard(self, awaitable):
+        """
+        Ejecuta `awaitable` pero aborta con BlockedError apenas se detecta un
+        bloqueo. Retorna su resultado (o propaga su excepción) si termina antes.
+        """
+        if self.blocked.is_set():
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            self.raise_if_blocked()
+        task = asyncio.ensure_future(awaitable)
+        blocked = asyncio.ensure_future(self.blocked.wait())
+        try:
+            await asyncio.wait({task, blocked}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            blocked.cancel()
+        if not task.done():
+            task.cancel()
+            self.raise_if_blocked()
+        return task.result()
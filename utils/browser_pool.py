@@ -0,0 +1,211 @@
+"""
+Pool de navegadores Chromium reutilizables
+
+Lanzar Chromium en cada scraping cuesta segundos y mucha CPU. Este módulo
+mantiene navegadores "calientes" por worker y los presta a los scrapers:
+
+- Health check al prestar y al devolver (browser.is_connected()).
+- Reciclaje tras N páginas servidas (BROWSER_MAX_PAGES).
+- Máximo de navegadores vivos por pool (BROWSER_POOL_SIZE).
+
+Uso:
+    profile = get_launch_profile("jumbo")
+    pool = get_browser_pool(f"jumbo:{profile.name}", profile.launch_options("jumbo"))
+    async with pool.context(**profile.context_options("jumbo")) as context:
+        page = await context.new_page()
+        ...
+
+Los objetos de Playwright están ligados al event loop donde se crearon, por eso
+los pools se recrean automáticamente si cambia el loop (ej: varios asyncio.run).
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright, Browser
+
+from utils.launch_profiles import with_headful_user_agent
+from utils.process_metrics import chromium_rss_bytes
+from utils.settings import env_int
+
+
+DEFAULT_MAX_BROWSERS = env_int("BROWSER_POOL_SIZE", 2)
+DEFAULT_MAX_PAGES = env_int("BROWSER_MAX_PAGES", 50)
+
+
+class _PooledBrowser:
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.pages_served = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Pool acotado de navegadores Chromium con las mismas opciones de lanzamiento.
+    """
+
+    def __init__(self, name: str, launch_options: dict | None = None,
+                 max_browsers: int = DEFAULT_MAX_BROWSERS,
+                 max_pages_per_browser: int = DEFAULT_MAX_PAGES):
+        self.name = name
+        self.launch_options = launch_options or {}
+        self.max_browsers = max(1, max_browsers)
+        self.max_pages_per_browser = max(1, max_pages_per_browser)
+        self.loop = asyncio.get_running_loop()
+        self.launches = 0
+        self.launch_seconds: list[float] = []
+        self.launch_rss_bytes: list[int] = []
+        self._semaphore = asyncio.Semaphore(self.max_browsers)
+        self._idle: list[_PooledBrowser] = []
+        self._closed = False
+
+    async def _launch(self) -> _PooledBrowser:
+        playwright = await _get_playwright()
+        rss_before = chromium_rss_bytes()
+        start = time.perf_counter()
+        browser = await playwright.chromium.launch(**self.launch_options)
+        elapsed = time.perf_counter() - start
+        rss_after = chromium_rss_bytes()
+
+        self.launches += 1
+        self.launch_seconds.append(elapsed)
+        if rss_before is not None and rss_after is not None:
+            self.launch_rss_bytes.append(max(0, rss_after - rss_before))
+        print(f"[BrowserPool:{self.name}] Navegador lanzado (#{self.launches}) en {elapsed:.2f}s")
+        return _PooledBrowser(browser)
+
+    def metrics(self) -> dict:
+        """Tiempo de lanzamiento y RSS promedio de los navegadores de este pool."""
+        return {
+            "launches": self.launches,
+            "idle": len(self._idle),
+            "avg_launch_seconds": (sum(self.launch_seconds) / len(self.launch_seconds)
+                                   if self.launch_seconds else None),
+            "avg_launch_rss_mb": (sum(self.launch_rss_bytes) / len(self.launch_rss_bytes) / 1024 ** 2
+                                  if self.launch_rss_bytes else None),
+        }
+
+    async def _checkout(self) -> _PooledBrowser:
+        while self._idle:
+            pooled = self._idle.pop()
+            if pooled.healthy:
+                return pooled
+            print(f"[BrowserPool:{self.name}] Descartando navegador desconectado")
+        return await self._launch()
+
+    async def _checkin(self, pooled: _PooledBrowser) -> None:
+        if self._closed or not pooled.healthy:
+            await _safe_close(pooled.browser)
+            return
+        if pooled.pages_served >= self.max_pages_per_browser:
+            print(f"[BrowserPool:{self.name}] Reciclando navegador tras {pooled.pages_served} páginas")
+            await _safe_close(pooled.browser)
+            return
+        self._idle.append(pooled)
+
+    @asynccontextmanager
+    async def browser(self):
+        """Presta un navegador del pool; se devuelve (o recicla) al salir."""
+        if self._closed:
+            raise RuntimeError(f"BrowserPool '{self.name}' cerrado")
+        async with self._semaphore:
+            pooled = await self._checkout()
+            try:
+                yield pooled
+            finally:
+                await self._checkin(pooled)
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """
+        Crea un BrowserContext aislado sobre un navegador del pool.
+        Cuenta las páginas abiertas en él para el reciclaje y lo cierra al salir.
+        Sin user_agent en las opciones y en headless, usa el nativo sin "HeadlessChrome".
+        """
+        async with self.browser() as pooled:
+            context_options = with_headful_user_agent(
+                context_options, pooled.browser, self.launch_options.get("headless", True)
+            )
+            context = await pooled.browser.new_context(**context_options)
+
+            def _count_page(_page):
+                pooled.pages_served += 1
+
+            context.on("page", _count_page)
+            try:
+                yield context
+            finally:
+                await _safe_close(context)
+
+    async def close(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await _safe_close(pooled.browser)
+
+
+_pools: dict[str, BrowserPool] = {}
+_playwright = None
+_playwright_loop = None
+# Un lock por loop: dos lanzamientos simultáneos no deben arrancar dos drivers
+_playwright_locks: dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+
+
+async def _get_playwright():
+    global _playwright, _playwright_loop
+    loop = asyncio.get_running_loop()
+    if _playwright is not None and _playwright_loop is loop:
+        return _playwright
+    lock = _playwright_locks.setdefault(loop, asyncio.Lock())
+    async with lock:
+        if _playwright is None or _playwright_loop is not loop:
+            _playwright = await async_playwright().start()
+            _playwright_loop = loop
+    return _playwright
+
+
+async def _safe_close(target) -> None:
+    try:
+        await target.close()
+    except Exception:
+        pass
+
+
+def get_browser_pool(name: str, launch_options: dict | None = None, **pool_options) -> BrowserPool:
+    """
+    Retorna el pool registrado con ese nombre, creándolo si no existe
+    (o si fue creado en otro event loop).
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(name)
+    if pool is None or pool.loop is not loop or pool._closed:
+        pool = BrowserPool(name, launch_options, **pool_options)
+        _pools[name] = pool
+    return pool
+
+
+def browser_pool_metrics() -> dict[str, dict]:
+    """Métricas de lanzamiento por pool (nombre = "<retailer>:<perfil>")."""
+    return {name: pool.metrics() for name, pool in _pools.items()}
+
+
+async def close_browser_pools() -> None:
+    """Cierra todos los navegadores del loop actual y detiene Playwright."""
+    global _playwright, _playwright_loop
+    loop = asyncio.get_running_loop()
+    for name, pool in list(_pools.items()):
+        if pool.loop is loop:
+            await pool.close()
+            del _pools[name]
+    if _playwright is not None and _playwright_loop is loop:
+        try:
+            await _playwright.stop()
+        except Exception:
+            pass
+        _playwright = None
+        _playwright_loop = None
+    _playwright_locks.pop(loop, None)
@@ -0,0 +1,292 @@
+"""
+Parsers HTML puros (sin navegador)
+
+Funciones que reciben HTML (bytes o str) y retornan productos/ofertas con la
+misma forma que los extractores en vivo de los scrapers. Sirven para:
+- re-parsear los HTML guardados como artefactos de depuración
+  (utils.artifacts, *.html.gz)
+- medir el parsing aislado de la navegación
+- correr en un ProcessPoolExecutor (funciones de módulo, sin estado)
+
+Los extractores en vivo leen los mismos strings crudos con un solo page.$$eval
+y pasan por las mismas funciones build_*/parse_* de este módulo, así que ambos
+caminos dan los mismos resultados. benchmarks/html_parser_parity.py lo verifica
+con los HTML grabados en benchmarks/fixtures/ (y contra el navegador si hay
+Chromium de Playwright).
+
+Uso:
+    python -m utils.html_parser jumbo /tmp/scraper-artifacts/jumbo/<task>-search.html.gz
+    python -m utils.html_parser google /tmp/scraper-artifacts/google/<task>-results.html.gz
+"""
+
+import gzip
+import re
+import sys
+import time
+
+from lxml import etree, html as lxml_html
+
+from utils.prices import parse_clp, parse_clp_batch
+
+
+# Extrae nombre, precio CLP y tienda desde el aria-label de cada tarjeta de producto.
+# Formato: "<nombre>. Precio actual: CLP <precio>. <tienda> y más."
+# Usamos aria-label porque es requerido por accesibilidad y Google no lo rota.
+ARIA_PRICE_RE = re.compile(
+    r'^(.+?)\.\s+Precio actual:\s+CLP\s+([\d\.,]+)\.\s+(.+?)(?:\s+y más)?(?:\.\s*.*)?$',
+    re.DOTALL
+)
+
+# Máximo de tarjetas principales que se consideran
+MAX_MAIN_CARDS = 40
+
+# Badges que pueden aparecer antes del nombre del retailer en el texto del panel
+PANEL_BADGES = {'más popular', 'cerca', 'mejor precio', 'más vendido', 'oferta'}
+
+
+def parse_panel_link_text(text: str) -> tuple[str, str]:
+    """
+    Parsea el texto de un link de panel: "<badge?>|<retailer>|CLP <precio>|..."
+    Retorna (retailer, precio_str) o ("", "") si no se puede parsear.
+    """
+    parts = [p.strip() for p in text.split('|') if p.strip()]
+    retailer = ""
+    price_str = ""
+
+    for i, part in enumerate(parts):
+        if part.lower() in PANEL_BADGES:
+            continue
+        if not retailer:
+            retailer = part
+            continue
+        if part.upper().startswith('CLP'):
+            price_str = part
+            break
+
+    return retailer, price_str
+
+
+def build_jumbo_products(raw_cards: list[dict]) -> list[dict]:
+    """Convierte los datos crudos de las tarjetas en productos, sin duplicados."""
+    products = []
+    seen_ids = set()
+
+    for raw in raw_cards:
+        item_id = raw.get('id')
+
+        # Evitar duplicados
+        if not item_id or item_id in seen_ids:
+            continue
+        seen_ids.add(item_id)
+
+        price = raw.get('price')
+        url = raw.get('href')
+        products.append({
+            'name': raw.get('name'),
+            'jumbo_id': item_id,
+            'price': parse_clp(price),
+            'url': f"https://www.jumbo.cl{url}" if url and not url.startswith('http') else url,
+            'image_url': raw.get('image')
+        })
+
+    return products
+
+
+def parse_google_panel_rows(rows: list[dict | None]) -> list[dict]:
+    """Convierte las filas crudas del panel ({href, text}) en resultados."""
+    results = []
+    seen = set()
+
+    for idx, row in enumerate(rows):
+        try:
+            # El link tiene href al producto en la tienda y texto con retailer + precio
+            if not row:
+                continue
+
+            href = row.get('href') or ''
+            text = row.get('text') or ''
+            text_pipe = '|'.join(t.strip() for t in text.split('\n') if t.strip())
+
+            retailer, price_str = parse_panel_link_text(text_pipe)
+            if not retailer or not price_str:
+                continue
+
+            key = retailer.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+
+            # Extraer nombre del producto del texto (parte después del precio)
+            product_name = ""
+            parts = [p.strip() for p in text_pipe.split('|') if p.strip()]
+            price_idx = next((i for i, p in enumerate(parts) if p.upper().startswith('CLP')), -1)
+            if price_idx >= 0 and price_idx + 1 < len(parts):
+                product_name = parts[price_idx + 1]
+
+            results.append({
+                "retailer": retailer,
+                "nombre": product_name,
+                "precio": price_str,
+                "sku": "N/A",
+                "url": href,
+                "encontrado": True
+            })
+
+        except Exception as e:
+            print(f"[HTML Parser] Error en item {idx+1}: {e}")
+            continue
+
+    return _with_clp_prices(results)
+
+
+def parse_google_main_labels(labels: list[str]) -> list[dict]:
+    """Convierte los aria-label de las tarjetas principales en resultados."""
+    results = []
+    seen = set()
+
+    for idx, label in enumerate(labels[:MAX_MAIN_CARDS]):
+        try:
+            m = ARIA_PRICE_RE.match((label or '').strip())
+            if not m:
+                continue
+
+            product_name = m.group(1).strip()
+            price_str = f"CLP {m.group(2).strip()}"
+            retailer = m.group(3).strip()
+
+            if 'general' in retailer.lower() or 'precio' in retailer.lower():
+                continue
+
+            key = (retailer.lower(), m.group(2))
+            if key in seen:
+                continue
+            seen.add(key)
+
+            results.append({
+                "retailer": retailer,
+                "nombre": product_name,
+                "precio": price_str,
+                "sku": "N/A",
+                "url": "",
+                "encontrado": True
+            })
+
+        except Exception as e:
+            print(f"[HTML Parser] Error en tarjeta {idx+1}: {e}")
+            continue
+
+    return _with_clp_prices(results)
+
+
+def _with_clp_prices(results: list[dict]) -> list[dict]:
+    """Agrega precio_clp (int) a cada oferta, parseando "precio" una sola vez aquí."""
+    for result, clp in zip(results, parse_clp_batch(r["precio"] for r in results)):
+        result["precio_clp"] = clp
+    return results
+
+
+# Elementos que innerText separa con saltos de línea
+_BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'table', 'tr', 'ul',
+}
+_SKIP_TAGS = {'script', 'style', 'template', 'noscript'}
+
+
+def _inner_text(element) -> str:
+    """Aproximación de HTMLElement.innerText: bloques en líneas separadas."""
+    chunks = []
+
+    def walk(el):
+        tag = el.tag if isinstance(el.tag, str) else ''
+        if tag in _SKIP_TAGS:
+            if el.tail:
+                chunks.append(el.tail)
+            return
+        block = tag in _BLOCK_TAGS
+        if block:
+            chunks.append('\n')
+        if el.text:
+            chunks.append(el.text)
+        for child in el:
+            walk(child)
+        if block:
+            chunks.append('\n')
+        if el.tail and el is not element:
+            chunks.append(el.tail)
+
+    walk(element)
+    return re.sub(r'[ \t]*\n[ \t\n]*', '\n', ''.join(chunks)).strip()
+
+
+def _xpath(content: bytes | str, query: str) -> list:
+    """Elementos del documento que calzan con `query`; [] si el HTML está vacío."""
+    # Los HTML guardados por los scrapers son UTF-8 (page.content())
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    if not content or not content.strip():
+        return []
+    try:
+        document = lxml_html.fromstring(content)
+    except etree.ParserError:
+        # lxml no arma documento (ej: solo comentarios o espacios)
+        return []
+    return document.xpath(query)
+
+
+def parse_jumbo_products(content: bytes | str) -> list[dict]:
+    """Productos desde el HTML de resultados de búsqueda de Jumbo (atributos data-cnstrc-*)."""
+    raw_cards = []
+    for card in _xpath(content, '//*[@data-cnstrc-item-name]'):
+        link = card.xpath('.//a[contains(@href, "/p")]')
+        img = card.xpath('.//img')
+        raw_cards.append({
+            'id': card.get('data-cnstrc-item-id'),
+            'name': card.get('data-cnstrc-item-name'),
+            'price': card.get('data-cnstrc-item-price'),
+            'href': link[0].get('href') if link else None,
+            'image': img[0].get('src') if img else None,
+        })
+    return build_jumbo_products(raw_cards)
+
+
+def parse_google_panel(content: bytes | str) -> list[dict]:
+    """Ofertas desde el panel de precios de Google Shopping (filas jsname="uwagwf")."""
+    rows = []
+    for row in _xpath(content, '//div[@jsname="uwagwf"][@role="listitem"]'):
+        link = row.xpath('.//a[@href and not(contains(@href, "google.com"))]')
+        rows.append({'href': link[0].get('href'), 'text': _inner_text(link[0])} if link else None)
+    return parse_google_panel_rows(rows)
+
+
+def parse_google_main(content: bytes | str) -> list[dict]:
+    """Ofertas desde los aria-label de las tarjetas principales de Google Shopping."""
+    labels = [card.get('aria-label') or '' for card in _xpath(content, '//*[@jsname="ZvZkAe"]')]
+    return parse_google_main_labels(labels)
+
+
+def parse_google_offers(content: bytes | str) -> list[dict]:
+    """Como el scraper en vivo: panel primero y, si está vacío, resultados principales."""
+    return parse_google_panel(content) or parse_google_main(content)
+
+
+_PARSERS = {
+    "jumbo": parse_jumbo_products,
+    "google": parse_google_offers,
+}
+
+
+if __name__ == "__main__":
+    kind, path = sys.argv[1], sys.argv[2]
+    with (gzip.open if path.endswith('.gz') else open)(path, 'rb') as f:
+        data = f.read()
+
+    start = time.perf_counter()
+    records = _PARSERS[kind](data)
+    elapsed = time.perf_counter() - start
+
+    for record in records:
+        print(record)
+    print(f"\n[HTML Parser] {len(records)} registros en {elapsed * 1000:.1f} ms ({len(data) / 1024:.0f} KB)")
@@ -0,0 +1,45 @@
+"""
+Cliente HTTP asíncrono compartido (httpx) con pool de conexiones keep-alive
+
+Un único AsyncClient por event loop, reutilizado por todos los módulos que
+hablan HTTP sin navegador (API de búsqueda de Jumbo, envío de resultados).
+
+Configuración (.env):
+    HTTP_MAX_CONNECTIONS=20
+    HTTP_MAX_KEEPALIVE=10
+    TIMEOUT=30
+"""
+
+import asyncio
+
+import httpx
+
+from utils.settings import env_float, env_int, env_str
+
+
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retorna el cliente del loop actual, creándolo si no existe."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=env_float("TIMEOUT", 30),
+            limits=httpx.Limits(
+                max_connections=env_int("HTTP_MAX_CONNECTIONS", 20),
+                max_keepalive_connections=env_int("HTTP_MAX_KEEPALIVE", 10),
+            ),
+            headers={"User-Agent": env_str("USER_AGENT", "simplify-scraper")},
+            follow_redirects=True,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente del loop actual."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
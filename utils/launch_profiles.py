@@ -0,0 +1,215 @@
+"""
+Perfiles de lanzamiento de Chromium
+
+Cada perfil define modo headless, args, viewport y user agent, con ajustes por
+retailer. El perfil activo se elige desde .env:
+
+    LAUNCH_PROFILE=headless-new            Perfil por defecto de todos los scrapers
+    LAUNCH_PROFILE_GOOGLE=headed-debug     Override por retailer
+    LAUNCH_USER_AGENT_GOOGLE=...           Override del user agent por retailer
+
+Perfiles disponibles:
+- headless-new: headless real (nuevo modo headless de Chromium), no requiere X server.
+- headed-debug: ventana visible, para depurar en local (comportamiento anterior).
+- low-memory: headless con flags para reducir memoria en workers chicos.
+
+Para medir tiempo de lanzamiento y RSS de cada perfil:
+    python -m utils.launch_profiles [retailer] [repeticiones]
+"""
+
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+
+from utils.settings import env_str
+
+
+_DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+)
+
+# User agent fijo por retailer; los que no aparecen usan el nativo de Chromium
+# (en headless, sin "HeadlessChrome": ver with_headful_user_agent)
+_RETAILER_USER_AGENTS = {
+    "google": _DEFAULT_USER_AGENT,
+}
+
+# Token de plataforma del user agent reducido de Chromium
+_UA_PLATFORMS = {
+    "darwin": "Macintosh; Intel Mac OS X 10_15_7",
+    "win32": "Windows NT 10.0; Win64; x64",
+}
+_UA_PLATFORM = _UA_PLATFORMS.get(sys.platform, "X11; Linux x86_64")
+
+# Args propios de cada retailer, se suman a los del perfil
+_RETAILER_ARGS = {
+    "google": [
+        '--disable-blink-features=AutomationControlled',
+        '--no-sandbox',
+        '--disable-setuid-sandbox',
+        '--disable-dev-shm-usage',
+        '--disable-accelerated-2d-canvas',
+        '--no-first-run',
+        '--no-zygote',
+        '--disable-gpu',
+        '--hide-scrollbars',
+        '--mute-audio',
+        '--disable-background-timer-throttling',
+        '--disable-backgrounding-occluded-windows',
+        '--disable-renderer-backgrounding',
+    ],
+    "jumbo": [
+        '--disable-dev-shm-usage',
+        '--no-first-run',
+    ],
+}
+
+
+@dataclass(frozen=True)
+class LaunchProfile:
+    name: str
+    headless: bool
+    channel: str | None = None
+    args: tuple[str, ...] = ()
+    viewport: dict = field(default_factory=lambda: {'width': 1920, 'height': 1080})
+    user_agent: str | None = None
+
+    def launch_options(self, retailer: str) -> dict:
+        """Opciones para chromium.launch()."""
+        args = list(self.args)
+        for arg in _RETAILER_ARGS.get(retailer, []):
+            if arg not in args:
+                args.append(arg)
+        options = {"headless": self.headless, "args": args}
+        if self.channel:
+            options["channel"] = self.channel
+        return options
+
+    def context_options(self, retailer: str) -> dict:
+        """
+        Opciones para browser.new_context() que dependen del perfil. User agent:
+        el del perfil, o LAUNCH_USER_AGENT_<RETAILER>, o el fijo del retailer;
+        sin ninguno, BrowserPool.context usa el nativo del navegador (sin
+        "HeadlessChrome" si el perfil es headless).
+        """
+        options = {"viewport": dict(self.viewport)}
+        user_agent = (
+            self.user_agent
+            or env_str(f"LAUNCH_USER_AGENT_{retailer.upper()}", "")
+            or _RETAILER_USER_AGENTS.get(retailer)
+        )
+        if user_agent:
+            options["user_agent"] = user_agent
+        return options
+
+
+def headful_user_agent(browser_version: str) -> str:
+    """User agent nativo (reducido) de Chromium `browser_version` con "Chrome" en vez de "HeadlessChrome"."""
+    major = browser_version.split('.')[0]
+    return (f'Mozilla/5.0 ({_UA_PLATFORM}) AppleWebKit/537.36 '
+            f'(KHTML, like Gecko) Chrome/{major}.0.0.0 Safari/537.36')
+
+
+def with_headful_user_agent(context_options: dict, browser, headless: bool) -> dict:
+    """
+    Sin user agent explícito, un navegador headless (incluso el nuevo modo)
+    reporta "HeadlessChrome" en navigator.userAgent y en los headers, que los
+    anti-bot (Cloudflare, PerimeterX) detectan: se fija el nativo sin esa marca.
+    """
+    if not headless or context_options.get("user_agent"):
+        return context_options
+    return {**context_options, "user_agent": headful_user_agent(browser.version)}
+
+
+PROFILES = {
+    # channel="chromium" usa el nuevo headless de Chromium (mismo binario que
+    # headed) en vez de chromium-headless-shell, más difícil de distinguir.
+    "headless-new": LaunchProfile(
+        name="headless-new",
+        headless=True,
+        channel="chromium",
+    ),
+    "headed-debug": LaunchProfile(
+        name="headed-debug",
+        headless=False,
+    ),
+    "low-memory": LaunchProfile(
+        name="low-memory",
+        headless=True,
+        args=(
+            '--disable-extensions',
+            '--disable-background-networking',
+            '--disable-component-update',
+            '--disable-default-apps',
+            '--disable-sync',
+            '--renderer-process-limit=2',
+            '--js-flags=--max-old-space-size=256',
+        ),
+        viewport={'width': 1366, 'height': 768},
+    ),
+}
+
+DEFAULT_PROFILE = "headless-new"
+
+
+def get_launch_profile(retailer: str) -> LaunchProfile:
+    """Retorna el perfil configurado para el retailer (LAUNCH_PROFILE_<RETAILER> o LAUNCH_PROFILE)."""
+    name = env_str(f"LAUNCH_PROFILE_{retailer.upper()}", "") or env_str("LAUNCH_PROFILE", DEFAULT_PROFILE)
+    profile = PROFILES.get(name)
+    if profile is None:
+        print(f"[LaunchProfiles] Perfil desconocido '{name}', usando '{DEFAULT_PROFILE}'")
+        profile = PROFILES[DEFAULT_PROFILE]
+    return profile
+
+
+async def measure_profiles(retailer: str = "google", repeats: int = 3) -> dict[str, dict]:
+    """
+    Lanza cada perfil `repeats` veces y mide tiempo de lanzamiento, RSS de
+    Chromium con una página abierta y señales básicas de automatización.
+    """
+    from playwright.async_api import async_playwright
+    from utils.process_metrics import chromium_rss_bytes
+
+    report = {}
+    async with async_playwright() as p:
+        for name, profile in PROFILES.items():
+            launch_times, rss_values = [], []
+            signals = {}
+            for _ in range(repeats):
+                start = time.perf_counter()
+                browser = await p.chromium.launch(**profile.launch_options(retailer))
+                launch_times.append(time.perf_counter() - start)
+
+                context = await browser.new_context(**with_headful_user_agent(
+                    profile.context_options(retailer), browser, profile.headless
+                ))
+                page = await context.new_page()
+                await page.goto("about:blank")
+                signals = await page.evaluate(
+                    "() => ({webdriver: navigator.webdriver, "
+                    "headless_ua: /HeadlessChrome/.test(navigator.userAgent)})"
+                )
+                rss = chromium_rss_bytes()
+                if rss is not None:
+                    rss_values.append(rss)
+                await browser.close()
+
+            report[name] = {
+                "launch_seconds": sum(launch_times) / len(launch_times),
+                "rss_mb": sum(rss_values) / len(rss_values) / 1024 ** 2 if rss_values else None,
+                **signals,
+            }
+    return report
+
+
+if __name__ == "__main__":
+    retailer = sys.argv[1] if len(sys.argv) > 1 else "google"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    results = asyncio.run(measure_profiles(retailer, repeats))
+    print(f"\n=== Perfiles de lanzamiento ({retailer}) ===")
+    for name, metrics in results.items():
+        rss = f"{metrics['rss_mb']:.0f} MB" if metrics['rss_mb'] is not None else "N/A"
+        print(f"{name:14s} launch {metrics['launch_seconds']:.2f}s  RSS {rss}  "
+              f"webdriver={metrics.get('webdriver')}  headless_ua={metrics.get('headless_ua')}")
@@ -0,0 +1,221 @@
+"""
+Exportación columnar (Arrow/Parquet) de snapshots de catálogo
+
+Escribe los productos y ofertas a medida que llegan de los scrapers (async
+generators) como record batches de Arrow en archivos Parquet, sin
+materializar el catálogo completo en memoria. Particionado estilo Hive:
+
+    {EXPORT_DIR}/date=2026-10-16/retailer_slug=jumbo/part-{run_id}.parquet
+    {EXPORT_DIR}/date=2026-10-16/retailer_slug=lider/part-{run_id}.parquet
+
+La clave de partición es retailer_slug (ej: "lider") para no chocar con la
+columna retailer ("Lider"). retailer y brand van codificadas como diccionario
+(pocos valores repetidos en millones de filas). Se leen de vuelta con:
+
+    pyarrow.dataset.dataset(EXPORT_DIR, partitioning="hive")
+
+Requiere pyarrow (fijado en requirements.txt).
+
+Uso:
+    async with ParquetExporter() as exporter:
+        async for product in iter_jumbo_catalog("Soprole"):
+            await exporter.write(jumbo_row(product, brand="Soprole"))
+
+    python -m utils.parquet_export jumbo Soprole
+    python -m utils.parquet_export google "Leche Entera Natural Soprole 1L"
+
+Configuración (.env):
+    EXPORT_DIR=/tmp/scraper-export
+    EXPORT_BATCH_ROWS=5000
+"""
+
+import asyncio
+import re
+import time
+import unicodedata
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.settings import env_int, env_str
+
+
+_DICT_COLUMNS = ("retailer", "brand")
+
+SCHEMA = pa.schema([
+    ("scraped_at", pa.timestamp("ms", tz="UTC")),
+    ("retailer", pa.dictionary(pa.int32(), pa.string())),
+    ("brand", pa.dictionary(pa.int32(), pa.string())),
+    ("search_term", pa.string()),
+    ("product_key", pa.string()),
+    ("name", pa.string()),
+    ("price_clp", pa.int64()),
+    ("price_raw", pa.string()),
+    ("url", pa.string()),
+    ("image_url", pa.string()),
+    ("found", pa.bool_()),
+])
+
+
+def _slug(value: str) -> str:
+    """'Líder' -> 'lider': sin tildes (NFKD, como normalize_term) y solo [a-z0-9-]."""
+    text = unicodedata.normalize("NFKD", value or "desconocido")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-') or "desconocido"
+
+
+def jumbo_row(product: dict, brand: str | None = None, search_term: str | None = None,
+              scraped_at: datetime | None = None) -> dict:
+    """Producto de scrape_jumbo_catalog / iter_jumbo_catalog -> fila de export."""
+    return {
+        "scraped_at": scraped_at or datetime.now(timezone.utc),
+        "retailer": "Jumbo",
+        "brand": brand,
+        "search_term": search_term or brand,
+        "product_key": product.get("jumbo_id"),
+        "name": product.get("name"),
+        "price_clp": product.get("price"),
+        "price_raw": None,
+        "url": product.get("url"),
+        "image_url": product.get("image_url"),
+        "found": True,
+    }
+
+
+def google_row(offer: dict, search_term: str, brand: str | None = None,
+               scraped_at: datetime | None = None) -> dict:
+    """Oferta de scrape_google_shopping / iter_google_shopping -> fila de export."""
+    return {
+        "scraped_at": scraped_at or datetime.now(timezone.utc),
+        "retailer": offer.get("retailer"),
+        "brand": brand,
+        "search_term": search_term,
+        "product_key": offer.get("url") or offer.get("nombre"),
+        "name": offer.get("nombre"),
+        "price_clp": offer.get("precio_clp"),
+        "price_raw": offer.get("precio"),
+        "url": offer.get("url"),
+        "image_url": None,
+        "found": bool(offer.get("encontrado")),
+    }
+
+
+class ParquetExporter:
+    """
+    Acumula filas por partición (fecha, retailer) y escribe un record batch
+    cada `batch_rows` filas en el Parquet abierto de esa partición.
+    """
+
+    def __init__(self, base_dir: str | None = None, batch_rows: int | None = None):
+        self.base_dir = Path(base_dir or env_str("EXPORT_DIR", "/tmp/scraper-export"))
+        self.batch_rows = max(1, batch_rows or env_int("EXPORT_BATCH_ROWS", 5000))
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.rows_written = 0
+        self.files: list[str] = []
+        self._buffers: dict[tuple[str, str], list[dict]] = {}
+        self._writers: dict[tuple[str, str], "pq.ParquetWriter"] = {}
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def write(self, row: dict) -> None:
+        scraped_at = row["scraped_at"]
+        key = (scraped_at.astimezone(timezone.utc).date().isoformat(), _slug(row["retailer"]))
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_rows:
+            await self._flush(key)
+
+    async def write_many(self, rows) -> None:
+        for row in rows:
+            await self.write(row)
+
+    async def close(self) -> None:
+        for key in list(self._buffers):
+            await self._flush(key)
+        async with self._lock:
+            await asyncio.to_thread(self._close_writers)
+        print(f"[ParquetExport] {self.rows_written} filas en {len(self.files)} archivos ({self.base_dir})")
+
+    async def _flush(self, key: tuple[str, str]) -> None:
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        async with self._lock:
+            await asyncio.to_thread(self._write_batch, key, rows)
+
+    def _write_batch(self, key: tuple[str, str], rows: list[dict]) -> None:
+        columns = {name: [row.get(name) for row in rows] for name in SCHEMA.names}
+        arrays = []
+        for field in SCHEMA:
+            if field.name in _DICT_COLUMNS:
+                arrays.append(pa.array(columns[field.name], pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(columns[field.name], field.type))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+        writer = self._writers.get(key)
+        if writer is None:
+            date, retailer = key
+            path = self.base_dir / f"date={date}" / f"retailer_slug={retailer}" / f"part-{self.run_id}.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(str(path), SCHEMA, compression="zstd", use_dictionary=True)
+            self._writers[key] = writer
+            self.files.append(str(path))
+        writer.write_batch(batch)
+        self.rows_written += len(rows)
+
+    def _close_writers(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+async def export_rows(rows, exporter: ParquetExporter) -> int:
+    """Consume un async iterable de filas y las escribe; retorna cuántas escribió."""
+    count = 0
+    async for row in rows:
+        await exporter.write(row)
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    import sys
+
+    from utils.browser_pool import close_browser_pools
+    from utils.http_client import close_http_client
+    from utils.redis_client import close_redis
+
+    async def _main(source: str, term: str):
+        from scrapers.google_shopping import iter_google_shopping
+        from scrapers.jumbo_catalog import iter_jumbo_catalog
+
+        async def rows():
+            if source == "jumbo":
+                async for product in iter_jumbo_catalog(term):
+                    yield jumbo_row(product, brand=term)
+            else:
+                async for offer in iter_google_shopping(term):
+                    if offer.get("encontrado"):
+                        yield google_row(offer, term)
+
+        try:
+            async with ParquetExporter() as exporter:
+                await export_rows(rows(), exporter)
+        finally:
+            await close_browser_pools()
+            await close_http_client()
+            await close_redis()
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("jumbo", "google"):
+        print("Uso: python -m utils.parquet_export jumbo|google <término>")
+        sys.exit(1)
+    asyncio.run(_main(sys.argv[1], sys.argv[2]))
@@ -0,0 +1,247 @@
+"""
+Historial de precios local (SQLite en modo WAL) con escritura por deltas
+
+Guarda una fila por cambio, no por observación: una observación solo se
+escribe si el precio o la disponibilidad difieren de la última conocida para
+ese (retailer, product_key) en ese instante. Un producto con el mismo precio
+durante un mes ocupa una fila, no miles.
+
+- product_key: jumbo_id para Jumbo; para Google, el término de búsqueda
+  normalizado (normalize_term): la URL de la oferta trae parámetros de
+  tracking (srsltid) que cambian en cada búsqueda.
+- Índice único (retailer, product_key, ts): "último precio" y "precio al
+  instante T" son una búsqueda en el índice (ORDER BY ts DESC LIMIT 1).
+- WAL: lecturas concurrentes mientras un worker escribe; varios procesos
+  pueden compartir el archivo (busy_timeout).
+
+Los métodos son síncronos; desde código async usar asyncio.to_thread.
+
+Uso:
+    history = PriceHistory()
+    history.record_jumbo_products(result["products"])
+    history.latest("Jumbo", "12345")
+    history.record_google_offers(results, "Leche Entera Natural Soprole 1L")
+    history.as_of("Lider", "leche entera natural soprole 1l", datetime(2026, 10, 1, tzinfo=timezone.utc))
+
+    python -m utils.price_history latest Jumbo 12345
+    python -m utils.price_history as-of Jumbo 12345 2026-10-01T12:00:00+00:00
+
+Configuración (.env):
+    PRICE_HISTORY_DB=/tmp/scraper-price-history.sqlite3
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from utils.result_cache import normalize_term
+from utils.settings import env_str
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_history (
+    retailer    TEXT    NOT NULL,
+    product_key TEXT    NOT NULL,
+    ts          INTEGER NOT NULL,   -- epoch en ms (UTC)
+    price_clp   INTEGER,
+    available   INTEGER NOT NULL,
+    name        TEXT,
+    url         TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_price_history_key_ts
+    ON price_history (retailer, product_key, ts);
+"""
+
+# Inserta solo si difiere de la última observación anterior o igual a ts
+_INSERT_DELTA = """
+INSERT OR IGNORE INTO price_history (retailer, product_key, ts, price_clp, available, name, url)
+SELECT :retailer, :product_key, :ts, :price_clp, :available, :name, :url
+WHERE NOT EXISTS (
+    SELECT 1 FROM (
+        SELECT price_clp, available FROM price_history
+        WHERE retailer = :retailer AND product_key = :product_key AND ts <= :ts
+        ORDER BY ts DESC LIMIT 1
+    ) AS last
+    WHERE last.price_clp IS :price_clp AND last.available = :available
+)
+"""
+
+_SELECT_AS_OF = """
+SELECT retailer, product_key, ts, price_clp, available, name, url FROM price_history
+WHERE retailer = ? AND product_key = ? AND ts <= ?
+ORDER BY ts DESC LIMIT 1
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class PricePoint:
+    retailer: str
+    product_key: str
+    ts: datetime
+    price_clp: int | None
+    available: bool
+    name: str | None
+    url: str | None
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "PricePoint":
+        retailer, product_key, ts, price_clp, available, name, url = row
+        return cls(retailer, product_key, datetime.fromtimestamp(ts / 1000, timezone.utc),
+                   price_clp, bool(available), name, url)
+
+
+def _to_ms(ts: datetime | float | None) -> int:
+    """datetime (con o sin tz; sin tz se asume UTC), epoch en segundos o None (ahora) -> ms."""
+    if ts is None:
+        return int(time.time() * 1000)
+    if isinstance(ts, datetime):
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return int(ts.timestamp() * 1000)
+    return int(ts * 1000)
+
+
+def _price_rank(offer: dict) -> tuple:
+    """Orden de ofertas del mismo retailer: menor precio primero, sin precio al final."""
+    price = offer.get("precio_clp")
+    return (price is None, price or 0, offer.get("nombre") or "")
+
+
+class PriceHistory:
+    def __init__(self, path: str | None = None):
+        self.path = Path(path or env_str("PRICE_HISTORY_DB", "/tmp/scraper-price-history.sqlite3"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def record(self, observations, ts: datetime | float | None = None) -> int:
+        """
+        Registra observaciones {"retailer", "product_key", "price_clp",
+        "available", "name"?, "url"?} (con "ts" opcional por fila). Retorna
+        cuántas filas se escribieron, es decir, cuántos cambios hubo.
+        """
+        default_ms = _to_ms(ts)
+        rows = [
+            {
+                "retailer": obs["retailer"],
+                "product_key": str(obs["product_key"]),
+                "ts": _to_ms(obs["ts"]) if obs.get("ts") is not None else default_ms,
+                "price_clp": obs.get("price_clp"),
+                "available": int(bool(obs.get("available", True))),
+                "name": obs.get("name"),
+                "url": obs.get("url"),
+            }
+            for obs in observations
+            if obs.get("retailer") and obs.get("product_key")
+        ]
+        if not rows:
+            return 0
+        # Orden por clave y tiempo: cada fila se compara contra la anterior ya insertada
+        rows.sort(key=lambda r: (r["retailer"], r["product_key"], r["ts"]))
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(_INSERT_DELTA, rows)
+            return self._conn.total_changes - before
+
+    def record_jumbo_products(self, products: list[dict], ts: datetime | float | None = None) -> int:
+        """Productos de scrape_jumbo_catalog (presentes en la búsqueda = disponibles)."""
+        return self.record((
+            {
+                "retailer": "Jumbo",
+                "product_key": p.get("jumbo_id"),
+                "price_clp": p.get("price"),
+                "available": True,
+                "name": p.get("name"),
+                "url": p.get("url"),
+            }
+            for p in products
+        ), ts)
+
+    def record_google_offers(self, offers: list[dict], search_term: str,
+                             ts: datetime | float | None = None) -> int:
+        """
+        Ofertas de scrape_google_shopping para `search_term` (se omiten los
+        dicts de error). La clave es (retailer, término normalizado): una
+        observación por retailer y término, estable entre búsquedas. Si un
+        retailer trae varias ofertas (fallback de resultados principales) se
+        registra la de menor precio, así el resultado no depende del orden.
+        """
+        product_key = normalize_term(search_term)
+        cheapest: dict[str, dict] = {}
+        for offer in offers:
+            retailer = offer.get("retailer")
+            if offer.get("error") or not retailer:
+                continue
+            current = cheapest.get(retailer)
+            if current is None or _price_rank(offer) < _price_rank(current):
+                cheapest[retailer] = offer
+        return self.record((
+            {
+                "retailer": retailer,
+                "product_key": product_key,
+                "price_clp": o.get("precio_clp"),
+                "available": o.get("encontrado", True),
+                "name": o.get("nombre"),
+                "url": o.get("url"),
+            }
+            for retailer, o in cheapest.items()
+        ), ts)
+
+    def latest(self, retailer: str, product_key: str) -> PricePoint | None:
+        return self.as_of(retailer, product_key, None)
+
+    def as_of(self, retailer: str, product_key: str, ts: datetime | float | None) -> PricePoint | None:
+        """Último precio conocido en el instante `ts` (None = ahora)."""
+        with self._lock:
+            row = self._conn.execute(_SELECT_AS_OF, (retailer, str(product_key), _to_ms(ts))).fetchone()
+        return PricePoint.from_row(row) if row else None
+
+    def history(self, retailer: str, product_key: str, since: datetime | float | None = None) -> list[PricePoint]:
+        """Cambios de precio/disponibilidad del producto, del más antiguo al más reciente."""
+        since_ms = _to_ms(since) if since is not None else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT retailer, product_key, ts, price_clp, available, name, url FROM price_history "
+                "WHERE retailer = ? AND product_key = ? AND ts >= ? ORDER BY ts",
+                (retailer, str(product_key), since_ms),
+            ).fetchall()
+        return [PricePoint.from_row(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] not in ("latest", "as-of", "history") or (args[0] == "as-of" and len(args) < 4):
+        print("Uso: python -m utils.price_history latest|history <retailer> <product_key>")
+        print("     python -m utils.price_history as-of <retailer> <product_key> <ISO 8601>")
+        sys.exit(1)
+
+    store = PriceHistory()
+    if args[0] == "history":
+        points = store.history(args[1], args[2])
+    elif args[0] == "as-of":
+        point = store.as_of(args[1], args[2], datetime.fromisoformat(args[3]))
+        points = [point] if point else []
+    else:
+        point = store.latest(args[1], args[2])
+        points = [point] if point else []
+
+    if not points:
+        print("Sin datos")
+    for point in points:
+        status = "disponible" if point.available else "no disponible"
+        print(f"{point.ts.isoformat()}  {point.retailer}  {point.product_key}  "
+              f"CLP {point.price_clp}  ({status})")
+    store.close()
@@ -0,0 +1,111 @@
+"""
+Parseo de precios en pesos chilenos (CLP)
+
+Convierte textos de precio a enteros CLP una sola vez, al extraer, para que
+los consumidores no vuelvan a parsear strings:
+
+    "CLP 1.290"            -> 1290
+    "$1.290 c/u"           -> 1290
+    "CLP 1.290 - 1.590"    -> 1290   (rangos: el primer precio)
+    "1.290,50"             -> 1291   (decimales redondeados)
+    "2 x $1.990"           -> 1990   (se prefiere el número junto a $ o CLP)
+    "N/A", "", None        -> None
+
+El punto es separador de miles cuando agrupa de a 3 dígitos ("1.290.000");
+si no, se toma como decimal ("12.5"). Igual para la coma.
+
+- parse_clp(): camino escalar, con caché para los precios repetidos.
+- parse_clp_batch(): muchos textos a la vez. Con listas parsea cada texto
+  distinto una sola vez (en lotes reales de ofertas es más rápido que pandas,
+  cuyo .str también recorre fila a fila); con una Series de pandas usa
+  parse_clp_series(), vectorizado, y retorna una Series Int64.
+"""
+
+import math
+import re
+from functools import lru_cache
+
+try:
+    import pandas as pd
+except ImportError:  # pandas es opcional
+    pd = None
+
+
+# Número junto a un marcador de moneda, o en su defecto el primer número
+_MARKED_RE = re.compile(r'(?:CLP|\$)\s*(\d[\d.,]*)', re.IGNORECASE)
+_NUMBER_RE = re.compile(r'(\d[\d.,]*)')
+_DOT_THOUSANDS_RE = r'\d{1,3}(?:\.\d{3})+(?:,\d+)?'
+_COMMA_THOUSANDS_RE = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?'
+_DOT_THOUSANDS = re.compile(_DOT_THOUSANDS_RE)
+_COMMA_THOUSANDS = re.compile(_COMMA_THOUSANDS_RE)
+
+
+def _round_half_up(value: float) -> int:
+    return int(math.floor(value + 0.5))
+
+
+@lru_cache(maxsize=8192)
+def _parse_text(text: str) -> int | None:
+    match = _MARKED_RE.search(text) or _NUMBER_RE.search(text)
+    if not match:
+        return None
+    token = match.group(1).rstrip('.,')
+
+    if _DOT_THOUSANDS.fullmatch(token):
+        token = token.replace('.', '').replace(',', '.')
+    elif _COMMA_THOUSANDS.fullmatch(token):
+        token = token.replace(',', '')
+    else:
+        token = token.replace(',', '.')
+
+    try:
+        return _round_half_up(float(token))
+    except ValueError:
+        return None
+
+
+def parse_clp(value) -> int | None:
+    """Texto (o número) de precio -> entero CLP, o None si no hay precio."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return None if math.isnan(value) else _round_half_up(value)
+    return _parse_text(str(value))
+
+
+def parse_clp_batch(values):
+    """parse_clp para muchos valores: lista -> lista, Series de pandas -> Series Int64."""
+    if pd is not None and isinstance(values, pd.Series):
+        return parse_clp_series(values)
+    parsed = {}
+    result = []
+    for value in values:
+        key = (type(value), value)
+        if key not in parsed:
+            parsed[key] = parse_clp(value)
+        result.append(parsed[key])
+    return result
+
+
+def parse_clp_series(series):
+    """Versión pandas: Series de textos -> Series Int64 (NA donde no hay precio)."""
+    if pd is None:
+        raise RuntimeError("parse_clp_series requiere pandas")
+
+    text = series.astype("string")
+    token = text.str.extract(_MARKED_RE, expand=False)
+    token = token.fillna(text.str.extract(_NUMBER_RE, expand=False)).str.rstrip('.,')
+
+    dot_thousands = token.str.fullmatch(_DOT_THOUSANDS_RE).fillna(False).astype(bool)
+    comma_thousands = token.str.fullmatch(_COMMA_THOUSANDS_RE).fillna(False).astype(bool) & ~dot_thousands
+    other = ~(dot_thousands | comma_thousands)
+
+    normalized = token.copy()
+    normalized[dot_thousands] = token[dot_thousands].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    normalized[comma_thousands] = token[comma_thousands].str.replace(',', '', regex=False)
+    normalized[other] = token[other].str.replace(',', '.', regex=False)
+
+    numbers = pd.to_numeric(normalized, errors="coerce")
+    return (numbers + 0.5).floordiv(1).astype("Int64")
@@ -0,0 +1,77 @@
+"""
+Métricas de memoria de procesos (RSS)
+
+Lee /proc en Linux para sumar la memoria residente de este proceso y sus
+descendientes (los procesos de Chromium lanzados por Playwright). En otros
+sistemas operativos las funciones retornan None.
+"""
+
+import os
+from pathlib import Path
+
+_PROC = Path("/proc")
+_CHROMIUM_NAMES = ("chrom", "headless_shell")
+
+
+def _read_status(pid: int) -> dict[str, str]:
+    status = {}
+    try:
+        for line in (_PROC / str(pid) / "status").read_text().splitlines():
+            key, _, value = line.partition(":")
+            status[key] = value.strip()
+    except OSError:
+        pass
+    return status
+
+
+def _rss_bytes(status: dict[str, str]) -> int:
+    # VmRSS viene en kB: "123456 kB"
+    value = status.get("VmRSS", "0 kB").split()[0]
+    return int(value) * 1024 if value.isdigit() else 0
+
+
+def _process_table() -> dict[int, dict[str, str]]:
+    table = {}
+    for entry in _PROC.iterdir():
+        if entry.name.isdigit():
+            status = _read_status(int(entry.name))
+            if status:
+                table[int(entry.name)] = status
+    return table
+
+
+def _descendants(root: int, table: dict[int, dict[str, str]]) -> list[int]:
+    children: dict[int, list[int]] = {}
+    for pid, status in table.items():
+        ppid = int(status.get("PPid", "0") or 0)
+        children.setdefault(ppid, []).append(pid)
+
+    found, stack = [], [root]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def process_tree_rss_bytes(include_self: bool = True) -> int | None:
+    """RSS total de este proceso y todos sus descendientes."""
+    if not _PROC.is_dir():
+        return None
+    table = _process_table()
+    pids = _descendants(os.getpid(), table)
+    if include_self:
+        pids.append(os.getpid())
+    return sum(_rss_bytes(table[pid]) for pid in pids if pid in table)
+
+
+def chromium_rss_bytes() -> int | None:
+    """RSS total de los procesos Chromium descendientes de este proceso."""
+    if not _PROC.is_dir():
+        return None
+    table = _process_table()
+    return sum(
+        _rss_bytes(table[pid])
+        for pid in _descendants(os.getpid(), table)
+        if any(name in table[pid].get("Name", "").lower() for name in _CHROMIUM_NAMES)
+    )
@@ -0,0 +1,169 @@
+"""
+Rate limiter por dominio e identidad, compartido entre workers vía Redis
+
+Implementa GCRA (generic cell rate algorithm, equivalente a un token bucket)
+con un script Lua atómico: en Redis solo se guarda el "theoretical arrival
+time" (TAT) de cada clave y el reloj es el de Redis (TIME), así que todos los
+workers ven el mismo estado sin importar el desfase de sus relojes.
+
+Clave: ratelimit:{dominio}:{identidad}. Cada navegación de los scrapers llama
+a `await rate_limiter.acquire(url, identity)`, que espera lo necesario antes
+de dejarla pasar. Si la espera superaría RATE_LIMIT_MAX_WAIT lanza
+RateLimitExceeded (con retry_after) en vez de dejarla pasar sin límite: los
+scrapers la propagan y las tareas de Celery se reprograman con ese countdown.
+
+Si Redis no está disponible el limiter deja pasar (fail-open) y lo cuenta en
+las métricas como "errors".
+
+Configuración (.env):
+    RATE_LIMIT_ENABLED=true
+    RATE_LIMIT_RPM_<DOMINIO>=12      Solicitudes por minuto (ej: RATE_LIMIT_RPM_GOOGLE_CL)
+    RATE_LIMIT_BURST_<DOMINIO>=3     Ráfaga permitida sin esperar
+    RATE_LIMIT_MAX_WAIT=120          Espera máxima por adquisición (s)
+"""
+
+import asyncio
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from redis.exceptions import RedisError
+
+from utils.redis_client import get_redis, mark_redis_down, redis_available
+from utils.settings import env_bool, env_float, env_int
+
+
+# KEYS[1] = clave; ARGV[1] = intervalo entre solicitudes (ms); ARGV[2] = ráfaga
+# Retorna 0 si la solicitud pasa, o los ms a esperar antes de reintentar.
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = interval * (tonumber(ARGV[2]) - 1)
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local allow_at = tat - tolerance
+if allow_at > now then
+    return allow_at - now
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now) + 1000)
+return 0
+"""
+
+# Solicitudes por minuto y ráfaga por defecto para los dominios conocidos
+_DEFAULT_LIMITS = {
+    "google.cl": (12, 3),
+    "jumbo.cl": (30, 5),
+    "ac.cnstrc.com": (60, 10),
+}
+
+
+class RateLimitExceeded(Exception):
+    """La solicitud tendría que esperar más de RATE_LIMIT_MAX_WAIT; reintentar en `retry_after` s."""
+
+    def __init__(self, domain: str, identity: str, retry_after: float):
+        super().__init__(f"Rate limit de {domain}/{identity}: reintentar en {retry_after:.0f}s")
+        self.domain = domain
+        self.identity = identity
+        self.retry_after = retry_after
+
+
+@dataclass
+class RateLimitStats:
+    acquisitions: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    rejected: int = 0
+    errors: int = 0
+
+    def summary(self) -> str:
+        avg = self.wait_seconds / self.throttled if self.throttled else 0.0
+        return (f"{self.acquisitions} adquisiciones, {self.throttled} con espera "
+                f"(prom {avg:.1f}s, máx {self.max_wait_seconds:.1f}s), "
+                f"{self.rejected} rechazadas, {self.errors} errores")
+
+
+def _domain(url_or_domain: str) -> str:
+    """'https://www.google.cl/search?...' -> 'google.cl'"""
+    host = urlparse(url_or_domain).hostname if "://" in url_or_domain else url_or_domain
+    host = (host or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _env_suffix(domain: str) -> str:
+    return re.sub(r'[^A-Z0-9]+', '_', domain.upper())
+
+
+class RateLimiter:
+    def __init__(self):
+        self.stats: dict[str, RateLimitStats] = defaultdict(RateLimitStats)
+
+    def limits(self, domain: str) -> tuple[float, int]:
+        """(solicitudes por minuto, ráfaga) del dominio; rpm <= 0 desactiva el límite."""
+        default_rpm, default_burst = _DEFAULT_LIMITS.get(domain, (0, 1))
+        suffix = _env_suffix(domain)
+        rpm = env_float(f"RATE_LIMIT_RPM_{suffix}", default_rpm)
+        burst = max(1, env_int(f"RATE_LIMIT_BURST_{suffix}", default_burst))
+        return rpm, burst
+
+    async def acquire(self, url_or_domain: str, identity: str = "default") -> float:
+        """
+        Espera hasta que el dominio admita otra solicitud de esta identidad.
+        Retorna los segundos esperados; lanza RateLimitExceeded si la espera
+        superaría RATE_LIMIT_MAX_WAIT (la solicitud no debe enviarse).
+        """
+        domain = _domain(url_or_domain)
+        rpm, burst = self.limits(domain)
+        if not domain or rpm <= 0 or not env_bool("RATE_LIMIT_ENABLED", True):
+            return 0.0
+
+        stats = self.stats[domain]
+        stats.acquisitions += 1
+        if not redis_available():
+            stats.errors += 1
+            return 0.0
+
+        key = f"ratelimit:{domain}:{identity}"
+        interval_ms = int(60000 / rpm)
+        max_wait = env_float("RATE_LIMIT_MAX_WAIT", 120)
+        start = time.monotonic()
+
+        while True:
+            try:
+                wait_ms = await self._eval(key, interval_ms, burst)
+            except (RedisError, OSError) as e:
+                mark_redis_down(e)
+                stats.errors += 1
+                break
+            if wait_ms <= 0:
+                break
+            waited = time.monotonic() - start
+            if waited + wait_ms / 1000 > max_wait:
+                stats.rejected += 1
+                print(f"[RateLimiter] {domain}/{identity}: espera supera {max_wait:.0f}s, rechazando")
+                raise RateLimitExceeded(domain, identity, wait_ms / 1000)
+            await asyncio.sleep(wait_ms / 1000)
+
+        waited = time.monotonic() - start
+        if waited >= 0.05:
+            stats.throttled += 1
+            stats.wait_seconds += waited
+            stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+            print(f"[RateLimiter] {domain}/{identity}: esperó {waited:.1f}s")
+        return waited
+
+    async def _eval(self, key: str, interval_ms: int, burst: int) -> int:
+        client = get_redis()
+        # register_script queda ligado al cliente (y su loop); se usa EVALSHA con fallback a EVAL
+        script = client.register_script(_GCRA_SCRIPT)
+        return int(await script(keys=[key], args=[interval_ms, burst]))
+
+    def metrics(self) -> dict[str, dict]:
+        return {domain: vars(stats).copy() for domain, stats in self.stats.items()}
+
+
+rate_limiter = RateLimiter()
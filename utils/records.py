@@ -0,0 +1,95 @@
+"""
+Registros compactos para productos y ofertas
+
+Alternativa tipada a los dicts de resultados para corridas de catálogo
+completo: dataclasses congeladas con __slots__ (sin __dict__ por instancia ni
+claves repetidas), nombre de retailer internado (una sola copia de "Lider" para
+todas sus ofertas) y precio entero en CLP.
+
+to_dict() produce exactamente el dict que entregan los scrapers (para JSON,
+Celery y la API); to_tuple() es la forma más compacta para serializar filas
+con un encabezado común (FIELDS).
+
+Uso:
+    products = [JumboProduct.from_dict(p) for p in result["products"]]
+    offers = [RetailerOffer.from_dict(o) for o in scrape_results]
+"""
+
+import sys
+from dataclasses import dataclass, fields
+
+from utils.prices import parse_clp
+
+
+@dataclass(frozen=True, slots=True)
+class JumboProduct:
+    name: str | None
+    jumbo_id: str
+    price: int | None
+    url: str | None
+    image_url: str | None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "JumboProduct":
+        return cls(data.get('name'), data['jumbo_id'], data.get('price'), data.get('url'), data.get('image_url'))
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'jumbo_id': self.jumbo_id,
+            'price': self.price,
+            'url': self.url,
+            'image_url': self.image_url,
+        }
+
+    def to_tuple(self) -> tuple:
+        return (self.name, self.jumbo_id, self.price, self.url, self.image_url)
+
+
+@dataclass(frozen=True, slots=True)
+class RetailerOffer:
+    retailer: str
+    nombre: str
+    precio: str
+    precio_clp: int | None
+    url: str
+    sku: str = "N/A"
+    encontrado: bool = True
+
+    def __post_init__(self):
+        object.__setattr__(self, "retailer", sys.intern(self.retailer))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RetailerOffer":
+        precio = data.get('precio') or "N/A"
+        precio_clp = data.get('precio_clp')
+        if precio_clp is None:
+            precio_clp = parse_clp(precio)
+        return cls(
+            data.get('retailer') or "",
+            data.get('nombre') or "",
+            precio,
+            precio_clp,
+            data.get('url') or "",
+            data.get('sku') or "N/A",
+            bool(data.get('encontrado', True)),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "retailer": self.retailer,
+            "nombre": self.nombre,
+            "precio": self.precio,
+            "precio_clp": self.precio_clp,
+            "sku": self.sku,
+            "url": self.url,
+            "encontrado": self.encontrado,
+        }
+
+    def to_tuple(self) -> tuple:
+        return (self.retailer, self.nombre, self.precio, self.precio_clp, self.url, self.sku, self.encontrado)
+
+
+# Encabezados de to_tuple(), en el mismo orden
+JUMBO_PRODUCT_FIELDS = tuple(f.name for f in fields(JumboProduct))
+RETAILER_OFFER_FIELDS = tuple(f.name for f in fields(RetailerOffer))
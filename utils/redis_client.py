@@ -0,0 +1,61 @@
+"""
+Cliente Redis asíncrono compartido (redis.asyncio)
+
+Un cliente por event loop, igual que utils.http_client: las conexiones de
+redis.asyncio quedan ligadas al loop donde se abrieron.
+
+Si Redis no responde, las funciones que dependen de él (rate limit, caché,
+locks) degradan a modo local; redis_available() evita reintentar la conexión
+en cada llamada durante REDIS_RETRY_SECONDS.
+
+Configuración (.env):
+    REDIS_URL=redis://localhost:6379/0
+    REDIS_RETRY_SECONDS=30
+"""
+
+import asyncio
+import time
+
+import redis.asyncio as redis
+
+from utils.settings import env_float, env_str
+
+
+_clients: dict[asyncio.AbstractEventLoop, redis.Redis] = {}
+_down_until = 0.0
+
+
+def get_redis() -> redis.Redis:
+    """Retorna el cliente del loop actual, creándolo si no existe."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = redis.Redis.from_url(
+            env_str("REDIS_URL", "redis://localhost:6379/0"),
+            socket_connect_timeout=2,
+            socket_timeout=5,
+            health_check_interval=30,
+        )
+        _clients[loop] = client
+    return client
+
+
+def redis_available() -> bool:
+    """False mientras dure la pausa tras una falla de conexión."""
+    return time.monotonic() >= _down_until
+
+
+def mark_redis_down(error: Exception) -> None:
+    """Registra una falla de conexión y pausa el uso de Redis por un rato."""
+    global _down_until
+    retry = env_float("REDIS_RETRY_SECONDS", 30)
+    if redis_available():
+        print(f"[Redis] No disponible ({error}); modo local por {retry:.0f}s")
+    _down_until = time.monotonic() + retry
+
+
+async def close_redis() -> None:
+    """Cierra el cliente del loop actual."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
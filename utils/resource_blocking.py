@@ -0,0 +1,189 @@
+"""
+Bloqueo de recursos de red por scraper
+
+Intercepta las requests del contexto con context.route() y aborta las que el
+scraper no necesita (imágenes, fuentes, video, analytics de terceros), según
+una política por tipo de recurso y dominio. Lleva contadores de requests
+bloqueadas y bytes ahorrados (estimados) para medir el impacto.
+
+Uso:
+    policy = get_resource_policy("jumbo")
+    stats = await install_resource_blocking(context, policy)
+    ...
+    print(stats.summary())
+
+Configuración (.env):
+    RESOURCE_BLOCKING=true|false             Activa/desactiva el bloqueo global
+    RESOURCE_BLOCK_TYPES_<SCRAPER>=image,... Reemplaza los tipos bloqueados
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from utils.settings import env_bool, env_str
+
+
+# Tamaño promedio aproximado por tipo de recurso, para estimar bytes ahorrados
+# (una request abortada no llega a informar su tamaño real).
+_ESTIMATED_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "stylesheet": 25_000,
+    "script": 60_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+_DEFAULT_ESTIMATED_BYTES = 10_000
+
+# Analytics, publicidad y tracking de terceros que ningún scraper necesita
+_TRACKING_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "criteo.com",
+    "criteo.net",
+    "tiktok.com",
+    "analytics.tiktok.com",
+    "newrelic.com",
+    "nr-data.net",
+)
+
+
+def _host_matches(host: str, domains: tuple[str, ...]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """
+    Reglas de bloqueo. allowed_domains tiene prioridad sobre todo lo demás,
+    luego blocked_domains y por último blocked_resource_types.
+    """
+    name: str
+    blocked_resource_types: frozenset[str] = frozenset()
+    blocked_domains: tuple[str, ...] = ()
+    allowed_domains: tuple[str, ...] = ()
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if _host_matches(host, self.allowed_domains):
+            return False
+        if _host_matches(host, self.blocked_domains):
+            return True
+        return resource_type in self.blocked_resource_types
+
+
+# Jumbo solo necesita el HTML/JS de la SPA y la API de búsqueda (Constructor.io)
+# para renderizar los atributos data-cnstrc-*.
+JUMBO_POLICY = ResourcePolicy(
+    name="jumbo",
+    blocked_resource_types=frozenset({"image", "media", "font", "stylesheet"}),
+    blocked_domains=_TRACKING_DOMAINS,
+    allowed_domains=("cnstrc.com",),
+)
+
+# Google es más sensible a huellas anómalas: se bloquea solo lo que no altera el
+# layout. Ajustar con RESOURCE_BLOCK_TYPES_GOOGLE para medir hasta dónde llegar.
+GOOGLE_POLICY = ResourcePolicy(
+    name="google",
+    blocked_resource_types=frozenset({"media", "font"}),
+)
+
+_POLICIES = {
+    "jumbo": JUMBO_POLICY,
+    "google": GOOGLE_POLICY,
+}
+
+
+def get_resource_policy(scraper: str) -> ResourcePolicy | None:
+    """
+    Retorna la política del scraper aplicando overrides de .env,
+    o None si el bloqueo está desactivado.
+    """
+    if not env_bool("RESOURCE_BLOCKING", True):
+        return None
+    policy = _POLICIES.get(scraper)
+    if policy is None:
+        return None
+
+    types_override = env_str(f"RESOURCE_BLOCK_TYPES_{scraper.upper()}", "").strip()
+    if types_override:
+        types = frozenset(t.strip() for t in types_override.split(",") if t.strip())
+        policy = ResourcePolicy(
+            name=policy.name,
+            blocked_resource_types=types - {"none"},
+            blocked_domains=policy.blocked_domains,
+            allowed_domains=policy.allowed_domains,
+        )
+    return policy
+
+
+@dataclass
+class BlockingStats:
+    """Contadores de un contexto con bloqueo de recursos."""
+    policy: str
+    allowed_requests: int = 0
+    blocked_requests: int = 0
+    bytes_saved_estimate: int = 0
+    bytes_loaded: int = 0
+    blocked_by_type: Counter = field(default_factory=Counter)
+    blocked_by_domain: Counter = field(default_factory=Counter)
+
+    def record_blocked(self, resource_type: str, url: str) -> None:
+        self.blocked_requests += 1
+        self.bytes_saved_estimate += _ESTIMATED_BYTES.get(resource_type, _DEFAULT_ESTIMATED_BYTES)
+        self.blocked_by_type[resource_type] += 1
+        self.blocked_by_domain[urlsplit(url).hostname or ""] += 1
+
+    def summary(self) -> str:
+        return (
+            f"{self.blocked_requests} bloqueadas / {self.allowed_requests} permitidas, "
+            f"~{self.bytes_saved_estimate / 1024:.0f} KB ahorrados, "
+            f"{self.bytes_loaded / 1024:.0f} KB descargados"
+        )
+
+
+# Acumulado por política en este proceso, para comparar corridas
+BLOCKING_TOTALS: dict[str, BlockingStats] = {}
+
+
+async def install_resource_blocking(context, policy: ResourcePolicy | None) -> BlockingStats:
+    """
+    Instala la intercepción en un BrowserContext. Con policy=None no intercepta
+    nada y retorna contadores vacíos.
+    """
+    stats = BlockingStats(policy=policy.name if policy else "off")
+    if policy is None:
+        return stats
+
+    totals = BLOCKING_TOTALS.setdefault(policy.name, BlockingStats(policy=policy.name))
+
+    async def _handle_route(route):
+        request = route.request
+        if policy.should_block(request.resource_type, request.url):
+            stats.record_blocked(request.resource_type, request.url)
+            totals.record_blocked(request.resource_type, request.url)
+            await route.abort("blockedbyclient")
+        else:
+            stats.allowed_requests += 1
+            totals.allowed_requests += 1
+            await route.continue_()
+
+    def _on_response(response):
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except ValueError:
+            size = 0
+        stats.bytes_loaded += size
+        totals.bytes_loaded += size
+
+    await context.route("**/*", _handle_route)
+    context.on("response", _on_response)
+    return stats
@@ -0,0 +1,176 @@
+"""
+Caché de resultados en Redis con TTL por retailer y stale-while-revalidate
+
+Una búsqueda de Google Shopping cuesta 30-60 s de navegador y los mismos
+términos se repiten mucho. Cada resultado se guarda bajo el término
+normalizado ("Leche Entera  Natural Soprole 1 L" == "leche entera natural soprole 1l"):
+
+- fresco (edad < TTL): se entrega directo.
+- stale (TTL <= edad < TTL + STALE): se entrega directo y se agenda un
+  refresco en segundo plano (uno por clave y proceso).
+- ausente o vencido: se ejecuta el scraping y se guarda.
+
+Los resultados vacíos ("Sin resultados") se guardan con un TTL corto (caché
+negativa); los errores (CAPTCHA, timeouts) nunca se guardan.
+
+Configuración (.env):
+    CACHE_ENABLED=true
+    CACHE_TTL_<RETAILER>=21600          Segundos de frescura (ej: CACHE_TTL_GOOGLE)
+    CACHE_STALE_<RETAILER>=86400        Segundos extra en que se sirve stale
+    CACHE_NEGATIVE_TTL=900              Frescura de "Sin resultados"
+"""
+
+import asyncio
+import json
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+
+from utils.redis_client import get_redis, mark_redis_down, redis_available
+from utils.settings import env_bool, env_int
+
+
+# Resultado de clasificar un valor antes de guardarlo
+CACHE_OK = "ok"
+CACHE_NEGATIVE = "negative"
+CACHE_SKIP = "skip"
+
+_DEFAULT_TTL = {
+    "google": 6 * 3600,
+    "jumbo": 12 * 3600,
+}
+_DEFAULT_STALE = 24 * 3600
+
+
+def normalize_term(term: str) -> str:
+    """Minúsculas, sin tildes, espacios colapsados y unidades pegadas al número ("1 L" -> "1l")."""
+    text = unicodedata.normalize("NFKD", term)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return re.sub(r'(\d)\s+(kg|g|gr|ml|cc|l|lt|un)\b', r'\1\2', text)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    errors: int = 0
+
+
+class ResultCache:
+    def __init__(self):
+        self.stats: dict[str, CacheStats] = defaultdict(CacheStats)
+        self._refreshing: set[str] = set()
+        self._background: set[asyncio.Task] = set()
+
+    def key(self, retailer: str, term: str) -> str:
+        return f"cache:{retailer}:{normalize_term(term)}"
+
+    def ttl(self, retailer: str, negative: bool = False) -> int:
+        if negative:
+            return env_int("CACHE_NEGATIVE_TTL", 900)
+        return env_int(f"CACHE_TTL_{retailer.upper()}", _DEFAULT_TTL.get(retailer, 3600))
+
+    def stale_window(self, retailer: str) -> int:
+        return env_int(f"CACHE_STALE_{retailer.upper()}", _DEFAULT_STALE)
+
+    async def get_or_fetch(self, retailer: str, term: str, fetch, classify, use_cache: bool | None = None):
+        """
+        Retorna el valor cacheado del término o ejecuta `fetch()` (corrutina
+        sin argumentos) y lo guarda según `classify(valor)`: CACHE_OK,
+        CACHE_NEGATIVE o CACHE_SKIP.
+        """
+        if use_cache is None:
+            use_cache = env_bool("CACHE_ENABLED", True)
+        if not use_cache or not redis_available():
+            return await fetch()
+
+        key = self.key(retailer, term)
+        stats = self.stats[retailer]
+        entry = await self._get(key, stats)
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            if age < self.ttl(retailer, entry["negative"]):
+                stats.hits += 1
+                if entry["negative"]:
+                    stats.negative_hits += 1
+                print(f"[Cache] {retailer} '{term}': hit ({age:.0f}s)")
+                return entry["value"]
+            if age < self.ttl(retailer, entry["negative"]) + self.stale_window(retailer):
+                stats.stale_hits += 1
+                print(f"[Cache] {retailer} '{term}': stale ({age:.0f}s), refrescando en segundo plano")
+                self._refresh_in_background(key, retailer, fetch, classify)
+                return entry["value"]
+
+        stats.misses += 1
+        value = await fetch()
+        await self._store(key, retailer, value, classify, stats)
+        return value
+
+    async def invalidate(self, retailer: str, term: str) -> None:
+        try:
+            await get_redis().delete(self.key(retailer, term))
+        except (RedisError, OSError) as e:
+            mark_redis_down(e)
+
+    def metrics(self) -> dict[str, dict]:
+        return {retailer: vars(stats).copy() for retailer, stats in self.stats.items()}
+
+    async def _get(self, key: str, stats: CacheStats) -> dict | None:
+        try:
+            raw = await get_redis().get(key)
+        except (RedisError, OSError) as e:
+            mark_redis_down(e)
+            stats.errors += 1
+            return None
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    async def _store(self, key: str, retailer: str, value, classify, stats: CacheStats) -> None:
+        outcome = classify(value)
+        if outcome == CACHE_SKIP or not redis_available():
+            return
+        negative = outcome == CACHE_NEGATIVE
+        entry = {"stored_at": time.time(), "negative": negative, "value": value}
+        expire = self.ttl(retailer, negative) + self.stale_window(retailer)
+        try:
+            await get_redis().set(key, json.dumps(entry, ensure_ascii=False), ex=expire)
+        except (RedisError, OSError, TypeError, ValueError) as e:
+            if isinstance(e, (RedisError, OSError)):
+                mark_redis_down(e)
+            stats.errors += 1
+            print(f"[Cache] No se pudo guardar {key}: {e}")
+
+    def _refresh_in_background(self, key: str, retailer: str, fetch, classify) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        stats = self.stats[retailer]
+
+        async def refresh():
+            try:
+                value = await fetch()
+                await self._store(key, retailer, value, classify, stats)
+                stats.refreshes += 1
+            except Exception as e:
+                print(f"[Cache] Error refrescando {key}: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+result_cache = ResultCache()
@@ -0,0 +1,237 @@
+"""
+Envío por lotes de resultados a la API (y de ahí al servicio de normalización con IA)
+
+En vez de un POST por producto, los registros se acumulan en un buffer acotado
+y se envían como NDJSON comprimido con gzip sobre el cliente HTTP compartido
+(keep-alive, utils.http_client):
+
+- flush por tamaño: al juntar RESULT_SINK_BATCH_SIZE registros
+- flush por tiempo: a los RESULT_SINK_FLUSH_SECONDS del primer registro del lote
+- flush explícito: await sink.flush() / al cerrar el sink
+- backpressure: put() espera si hay RESULT_SINK_MAX_BUFFER registros pendientes,
+  así un scraper rápido no acumula memoria sin límite si la API se atrasa
+
+Los lotes que fallan se reintentan con backoff exponencial; tras agotar los
+reintentos se descartan y se cuentan en las métricas.
+
+Uso:
+    async with ResultSink() as sink:
+        for product in products:
+            await sink.put({"retailer": "jumbo", **product})
+
+Prueba local contra un servidor stub (sin API real):
+    python -m utils.result_sink 5000
+
+Configuración (.env):
+    API_BASE_URL=http://localhost:8000
+    RESULT_SINK_PATH=/scraper/results
+    RESULT_SINK_BATCH_SIZE=500
+    RESULT_SINK_FLUSH_SECONDS=2
+    RESULT_SINK_MAX_BUFFER=5000
+    RESULT_SINK_RETRIES=3
+"""
+
+import asyncio
+import gzip
+import json
+from dataclasses import dataclass
+
+import httpx
+
+from utils.http_client import get_http_client
+from utils.settings import env_float, env_int, env_str
+
+
+# Marca en la cola para cortar el lote en curso y enviarlo de inmediato
+_FLUSH = object()
+
+
+@dataclass
+class SinkStats:
+    records_sent: int = 0
+    batches_sent: int = 0
+    bytes_raw: int = 0
+    bytes_gzip: int = 0
+    failed_batches: int = 0
+    records_dropped: int = 0
+    backpressure_waits: int = 0
+
+    def summary(self) -> str:
+        ratio = self.bytes_gzip / self.bytes_raw if self.bytes_raw else 0.0
+        return (f"{self.records_sent} registros en {self.batches_sent} lotes "
+                f"({self.bytes_gzip / 1024:.0f} KB gzip, {ratio:.0%} del original), "
+                f"{self.failed_batches} lotes fallidos, {self.records_dropped} descartados")
+
+
+def encode_ndjson_gzip(records: list[dict]) -> tuple[bytes, int]:
+    """Retorna (cuerpo gzip, tamaño sin comprimir)."""
+    raw = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records).encode("utf-8")
+    return gzip.compress(raw, compresslevel=5), len(raw)
+
+
+class ResultSink:
+    def __init__(self, endpoint: str | None = None, batch_size: int | None = None,
+                 flush_seconds: float | None = None, max_buffer: int | None = None,
+                 retries: int | None = None):
+        self.endpoint = endpoint or (
+            env_str("API_BASE_URL", "http://localhost:8000").rstrip("/")
+            + env_str("RESULT_SINK_PATH", "/scraper/results")
+        )
+        self.batch_size = max(1, batch_size or env_int("RESULT_SINK_BATCH_SIZE", 500))
+        self.flush_seconds = flush_seconds or env_float("RESULT_SINK_FLUSH_SECONDS", 2)
+        self.retries = retries if retries is not None else env_int("RESULT_SINK_RETRIES", 3)
+        self.stats = SinkStats()
+        self._queue: asyncio.Queue = asyncio.Queue(max(self.batch_size, max_buffer or env_int("RESULT_SINK_MAX_BUFFER", 5000)))
+        self._worker: asyncio.Task | None = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def put(self, record: dict) -> None:
+        """Encola un registro; espera (backpressure) si el buffer está lleno."""
+        self._ensure_worker()
+        if self._queue.full():
+            self.stats.backpressure_waits += 1
+        await self._queue.put(record)
+
+    async def put_many(self, records) -> None:
+        for record in records:
+            await self.put(record)
+
+    async def flush(self) -> None:
+        """Envía lo pendiente y espera a que todos los lotes terminen."""
+        if self._worker is None:
+            return
+        await self._queue.put(_FLUSH)
+        await self._queue.join()
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        print(f"[ResultSink] {self.stats.summary()}")
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            taken = 1
+            batch = [] if item is _FLUSH else [item]
+            deadline = loop.time() + self.flush_seconds
+            try:
+                while batch and len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    taken += 1
+                    if item is _FLUSH:
+                        break
+                    batch.append(item)
+                if batch:
+                    await self._send(batch)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    async def _send(self, batch: list[dict]) -> None:
+        body, raw_size = encode_ndjson_gzip(batch)
+        headers = {"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"}
+        for attempt in range(self.retries + 1):
+            try:
+                response = await get_http_client().post(self.endpoint, content=body, headers=headers)
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    self.stats.records_sent += len(batch)
+                    self.stats.batches_sent += 1
+                    self.stats.bytes_raw += raw_size
+                    self.stats.bytes_gzip += len(body)
+                    return
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPStatusError as e:
+                # 4xx: reintentar no va a cambiar la respuesta
+                error = f"HTTP {e.response.status_code}"
+                break
+            except httpx.HTTPError as e:
+                error = str(e) or type(e).__name__
+            if attempt < self.retries:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+        self.stats.failed_batches += 1
+        self.stats.records_dropped += len(batch)
+        print(f"[ResultSink] Lote de {len(batch)} registros descartado: {error}")
+
+
+_sinks: dict[asyncio.AbstractEventLoop, ResultSink] = {}
+
+
+def get_result_sink() -> ResultSink:
+    """Sink compartido del loop actual (ej: el loop persistente de un worker)."""
+    loop = asyncio.get_running_loop()
+    sink = _sinks.get(loop)
+    if sink is None:
+        sink = _sinks[loop] = ResultSink()
+    return sink
+
+
+async def close_result_sink() -> None:
+    """Envía lo pendiente y cierra el sink del loop actual."""
+    sink = _sinks.pop(asyncio.get_running_loop(), None)
+    if sink is not None:
+        await sink.close()
+
+
+if __name__ == "__main__":
+    import sys
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from utils.http_client import close_http_client
+
+    received = {"requests": 0, "records": 0}
+
+    class _StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            received["requests"] += 1
+            received["records"] += sum(1 for line in body.splitlines() if line.strip())
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    async def _main():
+        start = time.perf_counter()
+        async with ResultSink(endpoint=f"http://127.0.0.1:{server.server_port}/results") as sink:
+            for i in range(count):
+                await sink.put({"retailer": "Jumbo", "jumbo_id": str(i), "name": f"Producto {i}", "price": "1290"})
+        print(f"[ResultSink] Stub recibió {received['records']} registros en "
+              f"{received['requests']} requests ({time.perf_counter() - start:.2f}s)")
+        await close_http_client()
+
+    asyncio.run(_main())
+    server.shutdown()
@@ -0,0 +1,86 @@
+"""
+Persistencia de sesiones de navegador (storage_state) por retailer e identidad
+
+Guarda cookies y localStorage de un BrowserContext al terminar un scraping
+exitoso y los restaura en la siguiente corrida, para saltar el banner de
+consentimiento y partir desde una sesión ya establecida.
+
+Cada estado expira tras un TTL por retailer y se invalida explícitamente
+cuando la sesión queda bloqueada (ej: CAPTCHA).
+
+Configuración (.env):
+    SESSION_STATE_DIR=/tmp/scraper-sessions
+    SESSION_TTL_HOURS_<RETAILER>=24
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from utils.settings import env_float, env_str
+
+
+_DEFAULT_TTL_HOURS = {
+    "jumbo": 24 * 7,
+    "google": 24,
+}
+
+
+def _slug(value: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_.-]+', '_', value) or "default"
+
+
+class SessionStore:
+    def __init__(self, base_dir: str | None = None):
+        self.base_dir = Path(base_dir or env_str("SESSION_STATE_DIR", "/tmp/scraper-sessions"))
+
+    def path(self, retailer: str, identity: str = "default") -> Path:
+        return self.base_dir / _slug(retailer) / f"{_slug(identity)}.json"
+
+    def ttl_seconds(self, retailer: str) -> float:
+        hours = env_float(f"SESSION_TTL_HOURS_{retailer.upper()}", _DEFAULT_TTL_HOURS.get(retailer, 24))
+        return hours * 3600
+
+    def load(self, retailer: str, identity: str = "default") -> str | None:
+        """
+        Retorna la ruta del storage_state vigente (para new_context(storage_state=...)),
+        o None si no existe, expiró o está corrupto.
+        """
+        path = self.path(retailer, identity)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        if age > self.ttl_seconds(retailer):
+            print(f"[SessionStore] Sesión {retailer}/{identity} expirada ({age / 3600:.1f}h)")
+            self.invalidate(retailer, identity)
+            return None
+
+        try:
+            json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.invalidate(retailer, identity)
+            return None
+        return str(path)
+
+    async def save(self, context, retailer: str, identity: str = "default") -> None:
+        """Guarda el storage_state del contexto de forma atómica."""
+        path = self.path(retailer, identity)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            await context.storage_state(path=str(tmp_path))
+            os.replace(tmp_path, path)
+            print(f"[SessionStore] Sesión {retailer}/{identity} guardada")
+        except Exception as e:
+            print(f"[SessionStore] No se pudo guardar sesión {retailer}/{identity}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def invalidate(self, retailer: str, identity: str = "default") -> None:
+        self.path(retailer, identity).unlink(missing_ok=True)
+
+
+session_store = SessionStore()
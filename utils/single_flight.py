@@ -0,0 +1,205 @@
+"""
+Single-flight: una sola ejecución por (scraper, término) en curso
+
+Cuando llegan varias solicitudes idénticas en ráfaga, solo la primera abre
+navegador; las demás esperan y reciben el mismo resultado.
+
+- En el proceso: un mapa clave -> Future; las llamadas concurrentes del mismo
+  event loop esperan el Future del líder.
+- Entre workers: un lock en Redis (SET NX PX con token). El proceso que lo
+  obtiene ejecuta y publica el resultado en singleflight:result:{clave}:{token};
+  los demás leen el token del lock y esperan ese resultado. Si el lock se libera
+  sin resultado (el líder falló) se vuelve a competir por él.
+- Heartbeat: mientras el líder ejecuta, renueva el TTL del lock cada TTL/3
+  (solo si el token sigue siendo suyo), así un scraping más largo que el TTL
+  no deja entrar a un segundo líder; si el líder muere, el lock expira solo.
+  Los seguidores esperan mientras el lock siga con el mismo token, sin plazo
+  propio: no ejecutan en paralelo a un líder vivo.
+
+Sin Redis, la coalescencia queda limitada al proceso.
+
+Configuración (.env):
+    SINGLE_FLIGHT_LOCK_TTL=180      Vida del lock sin heartbeat (s): si el líder muere, sus
+                                    seguidores compiten por el lock a lo más este tiempo después
+    SINGLE_FLIGHT_RESULT_TTL=60     Vida del resultado publicado para los seguidores (s)
+    SINGLE_FLIGHT_POLL=0.5          Intervalo de consulta de los seguidores (s)
+"""
+
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+
+from utils.redis_client import get_redis, mark_redis_down, redis_available
+from utils.result_cache import normalize_term
+from utils.settings import env_float, env_int
+
+
+# Libera el lock solo si sigue siendo nuestro
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Renueva el TTL del lock solo si sigue siendo nuestro
+_EXTEND_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+@dataclass
+class SingleFlightStats:
+    executions: int = 0
+    coalesced_local: int = 0
+    coalesced_remote: int = 0
+    errors: int = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self.stats: dict[str, SingleFlightStats] = defaultdict(SingleFlightStats)
+        self._inflight: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+    async def do(self, scraper: str, term: str, fetch):
+        """
+        Ejecuta `fetch()` (corrutina sin argumentos) o se suma a una ejecución
+        idéntica en curso, en este proceso o en otro worker.
+        """
+        key = f"{scraper}:{normalize_term(term)}"
+        loop = asyncio.get_running_loop()
+        stats = self.stats[scraper]
+
+        future = self._inflight.get((loop, key))
+        if future is not None:
+            stats.coalesced_local += 1
+            print(f"[SingleFlight] {key}: esperando ejecución en curso")
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._inflight[(loop, key)] = future
+        try:
+            value = await self._run_distributed(key, fetch, stats)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marca la excepción como leída si no había seguidores
+            future.exception()
+            raise
+        finally:
+            del self._inflight[(loop, key)]
+
+    async def _run_distributed(self, key: str, fetch, stats: SingleFlightStats):
+        if not redis_available():
+            stats.executions += 1
+            return await fetch()
+
+        lock_key = f"singleflight:lock:{key}"
+        lock_ttl = env_int("SINGLE_FLIGHT_LOCK_TTL", 180)
+        poll = env_float("SINGLE_FLIGHT_POLL", 0.5)
+        token = uuid.uuid4().hex
+        waited_remote = False
+
+        # Se sigue al líder mientras su lock esté vivo (el heartbeat lo renueva);
+        # si se libera o expira sin resultado se vuelve a competir por él
+        while redis_available():
+            try:
+                client = get_redis()
+                if await client.set(lock_key, token, nx=True, px=lock_ttl * 1000):
+                    return await self._lead(key, lock_key, token, lock_ttl, fetch, stats)
+                leader = await client.get(lock_key)
+            except (RedisError, OSError) as e:
+                mark_redis_down(e)
+                stats.errors += 1
+                break
+
+            if leader is None:
+                continue
+            if not waited_remote:
+                waited_remote = True
+                stats.coalesced_remote += 1
+                print(f"[SingleFlight] {key}: esperando resultado de otro worker")
+            value = await self._follow(key, lock_key, leader.decode(), poll, stats)
+            if value is not None:
+                return value[0]
+
+        stats.executions += 1
+        return await fetch()
+
+    async def _lead(self, key: str, lock_key: str, token: str, lock_ttl: int, fetch,
+                    stats: SingleFlightStats):
+        stats.executions += 1
+        client = get_redis()
+        heartbeat = asyncio.create_task(self._heartbeat(key, lock_key, token, lock_ttl, stats))
+        try:
+            value = await fetch()
+            try:
+                await client.set(f"singleflight:result:{key}:{token}", json.dumps(value, ensure_ascii=False),
+                                 ex=env_int("SINGLE_FLIGHT_RESULT_TTL", 60))
+            except (RedisError, OSError, TypeError, ValueError) as e:
+                stats.errors += 1
+                print(f"[SingleFlight] No se pudo publicar {key}: {e}")
+            return value
+        finally:
+            heartbeat.cancel()
+            try:
+                await client.register_script(_RELEASE_SCRIPT)(keys=[lock_key], args=[token])
+            except (RedisError, OSError) as e:
+                mark_redis_down(e)
+
+    async def _heartbeat(self, key: str, lock_key: str, token: str, lock_ttl: int,
+                         stats: SingleFlightStats) -> None:
+        """Renueva el TTL del lock cada lock_ttl/3 mientras siga siendo del token."""
+        script = get_redis().register_script(_EXTEND_SCRIPT)
+        while True:
+            await asyncio.sleep(lock_ttl / 3)
+            try:
+                if not await script(keys=[lock_key], args=[token, lock_ttl * 1000]):
+                    print(f"[SingleFlight] {key}: lock perdido, otro worker puede ejecutar en paralelo")
+                    return
+            except (RedisError, OSError) as e:
+                mark_redis_down(e)
+                stats.errors += 1
+                return
+
+    async def _follow(self, key: str, lock_key: str, token: str, poll: float,
+                      stats: SingleFlightStats) -> tuple | None:
+        """
+        Espera el resultado publicado por el líder `token` mientras el lock siga
+        siendo suyo. Retorna (valor,) o None si el lock se liberó (o cambió de
+        dueño) sin resultado, o si Redis falló.
+        """
+        client = get_redis()
+        result_key = f"singleflight:result:{key}:{token}"
+        while True:
+            await asyncio.sleep(poll)
+            try:
+                raw = await client.get(result_key)
+                if raw is not None:
+                    return (json.loads(raw),)
+                current = await client.get(lock_key)
+                if current is None or current.decode() != token:
+                    # Último intento: el líder pudo publicar justo antes de liberar
+                    raw = await client.get(result_key)
+                    return (json.loads(raw),) if raw is not None else None
+            except (RedisError, OSError) as e:
+                mark_redis_down(e)
+                stats.errors += 1
+                return None
+
+    def metrics(self) -> dict[str, dict]:
+        return {scraper: vars(stats).copy() for scraper, stats in self.stats.items()}
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,201 @@
+"""
+Perfiles de timing para navegación "humana"
+
+Reemplaza las esperas fijas (wait_for_timeout(random.randint(...))) por esperas
+condicionadas: primero se espera a que ocurra algo concreto (aparece un selector,
+la red queda quieta) y recién después se aplica un jitter aleatorio encima.
+
+Perfiles:
+- fast: jitter mínimo, sin esperar networkidle. Máximo throughput.
+- humanlike: jitter moderado tras cada condición (por defecto).
+- paranoid: jitter amplio y networkidle en cada paso, para sesiones con CAPTCHA frecuente.
+
+Si la sesión tiene un BlockDetector, cada espera se aborta con BlockedError
+apenas aparece un bloqueo, en vez de consumir el resto del presupuesto de tiempo.
+
+Cada espera queda registrada (condición, jitter y total en ms) en StepTimer.records
+y acumulada por perfil en TIMING_STATS (conteo, suma y máximo por paso, de
+tamaño fijo aunque el worker corra semanas), junto al número de CAPTCHAs por
+perfil, para ajustar throughput vs tasa de bloqueo.
+
+Configuración (.env):
+    TIMING_PROFILE=humanlike
+"""
+
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from utils.block_detector import BlockDetector, BlockedError
+from utils.settings import env_str
+
+
+@dataclass(frozen=True)
+class TimingProfile:
+    name: str
+    jitter_scale: float
+    condition_timeout_ms: int
+    wait_network_idle: bool
+    typing_delay_ms: tuple[int, int]
+    mouse_moves: tuple[int, int]
+
+    def jitter_ms(self, base: tuple[int, int]) -> int:
+        low, high = base
+        return int(random.randint(low, high) * self.jitter_scale)
+
+
+PROFILES = {
+    "fast": TimingProfile(
+        name="fast",
+        jitter_scale=0.15,
+        condition_timeout_ms=10000,
+        wait_network_idle=False,
+        typing_delay_ms=(20, 50),
+        mouse_moves=(0, 1),
+    ),
+    "humanlike": TimingProfile(
+        name="humanlike",
+        jitter_scale=1.0,
+        condition_timeout_ms=15000,
+        wait_network_idle=True,
+        typing_delay_ms=(80, 180),
+        mouse_moves=(2, 4),
+    ),
+    "paranoid": TimingProfile(
+        name="paranoid",
+        jitter_scale=2.5,
+        condition_timeout_ms=30000,
+        wait_network_idle=True,
+        typing_delay_ms=(120, 260),
+        mouse_moves=(3, 6),
+    ),
+}
+
+DEFAULT_PROFILE = "humanlike"
+
+
+def get_timing_profile(name: str | None = None) -> TimingProfile:
+    name = name or env_str("TIMING_PROFILE", DEFAULT_PROFILE)
+    profile = PROFILES.get(name)
+    if profile is None:
+        print(f"[Timing] Perfil desconocido '{name}', usando '{DEFAULT_PROFILE}'")
+        profile = PROFILES[DEFAULT_PROFILE]
+    return profile
+
+
+@dataclass
+class StepStats:
+    count: int = 0
+    total_ms: int = 0
+    max_ms: int = 0
+
+    def add(self, ms: int) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+# Acumulado por perfil y paso en este proceso: {perfil: {paso: StepStats}}
+TIMING_STATS: dict[str, dict[str, StepStats]] = defaultdict(lambda: defaultdict(StepStats))
+# Sesiones y CAPTCHAs por perfil: {perfil: {"sessions": n, "captchas": n}}
+PROFILE_OUTCOMES: dict[str, dict[str, int]] = defaultdict(lambda: {"sessions": 0, "captchas": 0})
+
+
+class StepTimer:
+    """
+    Ejecuta y registra las esperas de una sesión de navegación con un perfil.
+    """
+
+    def __init__(self, page, profile: TimingProfile, detector: BlockDetector | None = None):
+        self.page = page
+        self.profile = profile
+        self.detector = detector
+        self.records: list[dict] = []
+
+    async def _guarded(self, awaitable):
+        if self.detector is None:
+            return await awaitable
+        return await self.detector.guard(awaitable)
+
+    async def wait(self, step: str, selector: str | None = None, network_idle: bool = False,
+                   jitter: tuple[int, int] = (0, 0), state: str = "visible") -> bool:
+        """
+        Espera la condición del paso (selector y/o networkidle) y luego aplica jitter.
+        Retorna False si la condición no se cumplió dentro del timeout del perfil.
+        """
+        start = time.perf_counter()
+        condition_met = True
+
+        if selector:
+            try:
+                await self._guarded(self.page.wait_for_selector(
+                    selector, state=state, timeout=self.profile.condition_timeout_ms
+                ))
+            except BlockedError:
+                raise
+            except Exception:
+                condition_met = False
+
+        if network_idle and self.profile.wait_network_idle:
+            try:
+                await self._guarded(self.page.wait_for_load_state(
+                    "networkidle", timeout=self.profile.condition_timeout_ms
+                ))
+            except BlockedError:
+                raise
+            except Exception:
+                pass
+
+        condition_ms = int((time.perf_counter() - start) * 1000)
+        jitter_ms = self.profile.jitter_ms(jitter)
+        if jitter_ms > 0:
+            await self._guarded(self.page.wait_for_timeout(jitter_ms))
+
+        self._record(step, condition_ms, jitter_ms, condition_met)
+        return condition_met
+
+    async def pause(self, step: str, jitter: tuple[int, int]) -> None:
+        """Pausa breve sin condición (entre movimientos de mouse, teclas, scroll)."""
+        jitter_ms = self.profile.jitter_ms(jitter)
+        if jitter_ms > 0:
+            await self._guarded(self.page.wait_for_timeout(jitter_ms))
+        self._record(step, 0, jitter_ms, True)
+
+    def typing_delay(self) -> int:
+        return random.randint(*self.profile.typing_delay_ms)
+
+    def mouse_moves(self) -> int:
+        return random.randint(*self.profile.mouse_moves)
+
+    def _record(self, step: str, condition_ms: int, jitter_ms: int, condition_met: bool) -> None:
+        total_ms = condition_ms + jitter_ms
+        self.records.append({
+            "step": step,
+            "condition_ms": condition_ms,
+            "jitter_ms": jitter_ms,
+            "total_ms": total_ms,
+            "condition_met": condition_met,
+        })
+        TIMING_STATS[self.profile.name][step].add(total_ms)
+
+    def record_outcome(self, captcha: bool) -> None:
+        outcome = PROFILE_OUTCOMES[self.profile.name]
+        outcome["sessions"] += 1
+        if captcha:
+            outcome["captchas"] += 1
+
+    @property
+    def total_ms(self) -> int:
+        return sum(r["total_ms"] for r in self.records)
+
+    def summary(self) -> str:
+        per_step = defaultdict(int)
+        for record in self.records:
+            per_step[record["step"]] += record["total_ms"]
+        steps = ", ".join(f"{step}={ms / 1000:.1f}s" for step, ms in per_step.items())
+        return f"[{self.profile.name}] {self.total_ms / 1000:.1f}s total ({steps})"